@@ -0,0 +1,2 @@
+# ai-service/conftest.py
+# Puts the ai-service root on sys.path so tests import `models.` / `services.` like main.py does
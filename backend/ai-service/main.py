@@ -73,13 +73,16 @@
 
 
 # ai-service/main.py
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional, List
 import logging
 from datetime import datetime
 import io
 import json
+import numpy as np
+import pyarrow as pa
 
 # Import your services
 from services.vertex_service import VertexAIService
@@ -87,6 +90,7 @@ from services.gemini_service import GeminiService
 from services.gcp_service import GCPService
 from models.damage_assessment.image_classifier import DamageClassifier
 from models.resource_optimization.predictive_model import ResourcePredictor
+from models.disaster_prediction.lstm_model import DisasterPredictionLSTM
 
 # Initialize the app
 app = FastAPI(
@@ -110,6 +114,8 @@ gemini_service = GeminiService()
 gcp_service = GCPService()
 damage_classifier = DamageClassifier()
 resource_predictor = ResourcePredictor()
+disaster_lstm = DisasterPredictionLSTM()
+disaster_lstm_loaded = False  # /predict/risk/batch answers 503 until the trained LSTM is loaded
 
 # Configure logging
 logging.basicConfig(
@@ -121,15 +127,25 @@ logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
     """Initialize models and services on startup"""
+    global resource_predictor, disaster_lstm_loaded
     try:
         # Load models (in production, these would be loaded from Vertex AI)
         damage_classifier.load("models/damage_classifier.h5")
-        resource_predictor.load_models("models/resource_predictor")
+        resource_predictor = ResourcePredictor.load_models("models/resource_predictor")
         
         logger.info("AI models loaded successfully")
     except Exception as e:
         logger.error(f"Failed to initialize models: {str(e)}")
         raise
+    
+    # Optional: only batch risk scoring depends on it
+    try:
+        loaded_lstm = DisasterPredictionLSTM.load("models/disaster_lstm.h5")
+        disaster_lstm.model = loaded_lstm.model
+        disaster_lstm.normalization = loaded_lstm.normalization
+        disaster_lstm_loaded = True
+    except Exception as e:
+        logger.warning(f"Disaster LSTM not loaded, batch risk scoring disabled: {str(e)}")
 
 @app.get("/")
 def health_check():
@@ -174,6 +190,71 @@ async def predict_disaster(
         logger.error(f"Prediction failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/predict/risk/batch")
+async def predict_risk_batch(request: Request):
+    """
+    Score disaster risk for many stations in a single batched forward pass
+    
+    Accepts either
+      - JSON: {"station_ids": [...], "readings": [[[...features] x sequence_length] x stations]}
+      - Arrow IPC stream (Content-Type: application/vnd.apache.arrow.stream):
+        a 'station_id' column plus one fixed-length list column per feature,
+        matched by name to the features the model was trained on
+    """
+    if not disaster_lstm_loaded:
+        raise HTTPException(status_code=503, detail="Disaster LSTM model is not loaded")
+    try:
+        body = await request.body()
+        if request.headers.get('content-type', '').startswith('application/vnd.apache.arrow'):
+            station_ids, readings = _decode_arrow_readings(body)
+        else:
+            payload = json.loads(body)
+            station_ids = payload['station_ids']
+            readings = np.asarray(payload['readings'], dtype=np.float32)
+        
+        if len(station_ids) != len(readings):
+            raise ValueError("station_ids and readings must have the same length")
+        
+        probabilities = await run_in_threadpool(disaster_lstm.predict_batch, readings)
+        
+        return {
+            "station_ids": list(station_ids),
+            "probabilities": probabilities.round(6).tolist(),
+            "count": len(station_ids),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except (KeyError, ValueError) as e:
+        logger.error(f"Batch risk scoring rejected: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch risk scoring failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _decode_arrow_readings(body: bytes):
+    """Convert an Arrow IPC stream into (station_ids, [stations, sequence_length, features])"""
+    table = pa.ipc.open_stream(body).read_all()
+    if disaster_lstm.normalization is not None:
+        # Stored order, so each column gets its own training mean/std
+        feature_columns = disaster_lstm.normalization['feature_columns']
+        missing = [name for name in feature_columns if name not in table.column_names]
+        if missing:
+            raise HTTPException(status_code=422, detail=f"Missing feature columns: {missing}")
+    else:
+        feature_columns = [name for name in table.column_names if name != 'station_id']
+    sequence_length = disaster_lstm.config['sequence_length']
+    
+    # Flatten each list column without per-row Python conversion
+    features = [
+        table.column(name).combine_chunks().flatten().to_numpy(zero_copy_only=False)
+        .astype(np.float32).reshape(table.num_rows, sequence_length)
+        for name in feature_columns
+    ]
+    readings = np.stack(features, axis=-1) if features else np.empty((0, sequence_length, 0), dtype=np.float32)
+    return table.column('station_id').to_pylist(), readings
+
 @app.post("/analyze/report")
 async def analyze_report(
     text_report: Optional[str] = Form(None),
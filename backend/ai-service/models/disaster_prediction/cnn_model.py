@@ -5,6 +5,7 @@ from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropou
 from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
 import numpy as np
+from models.disaster_prediction.input_pipeline import ShardedInputPipeline
 
 class SatelliteImageCNN:
     def __init__(self, config=None):
@@ -92,6 +93,43 @@ class SatelliteImageCNN:
         
         return history
     
+    def train_from_shards(self, train_sources, val_sources=None, input_pipeline=None):
+        """
+        Train on TFRecord image shards streamed through tf.data instead of in-memory arrays
+        
+        Args:
+            train_sources: Glob pattern(s) or paths of training TFRecord shards
+            val_sources: Glob pattern(s) or paths of validation TFRecord shards
+            input_pipeline: ShardedInputPipeline (defaults to a new instance)
+        
+        Returns:
+            History object containing training metrics
+        """
+        pipeline = input_pipeline or ShardedInputPipeline()
+        
+        def make_dataset(sources, shuffle):
+            return pipeline.image_dataset(
+                sources,
+                image_shape=self.config['input_shape'],
+                batch_size=self.config['batch_size'],
+                shuffle=shuffle
+            )
+        
+        callbacks = [
+            EarlyStopping(patience=8, restore_best_weights=True, monitor='val_loss'),
+            ReduceLROnPlateau(factor=0.2, patience=5, min_lr=1e-6)
+        ]
+        
+        history = self.model.fit(
+            make_dataset(train_sources, shuffle=True),
+            epochs=self.config['epochs'],
+            validation_data=make_dataset(val_sources, shuffle=False) if val_sources else None,
+            callbacks=callbacks,
+            verbose=1
+        )
+        
+        return history
+    
     def predict(self, X):
         """
         Make predictions using the trained model
@@ -1,6 +1,8 @@
 import tensorflow as tf
 from tensorflow.keras import layers, Model
 import numpy as np
+import os
+import time
 
 class DisasterGAN:
     def __init__(self, config=None):
@@ -16,11 +18,21 @@ class DisasterGAN:
             'disaster_classes': 5,
             'g_lr': 0.0002,
             'd_lr': 0.0002,
-            'batch_size': 32
+            'batch_size': 32,
+            'xla': False,              # jit_compile the custom train step
+            'mixed_precision': False   # float16 compute with loss scaling
         }
-        self.generator = self._build_generator()
-        self.discriminator = self._build_discriminator()
-        self.gan = self._build_gan()
+        # Layers take the global policy when they are built; switch it only
+        # while building the GAN so models created later stay float32
+        previous_policy = tf.keras.mixed_precision.global_policy()
+        if self.config.get('mixed_precision'):
+            tf.keras.mixed_precision.set_global_policy('mixed_float16')
+        try:
+            self.generator = self._build_generator()
+            self.discriminator = self._build_discriminator()
+            self.gan = self._build_gan()
+        finally:
+            tf.keras.mixed_precision.set_global_policy(previous_policy)
         
     def _build_generator(self):
         """Build generator that creates synthetic disaster images"""
@@ -42,7 +54,7 @@ class DisasterGAN:
         x = layers.Conv2DTranspose(64, 4, strides=2, padding='same')(x)
         x = layers.BatchNormalization()(x)
         x = layers.LeakyReLU(0.2)(x)
-        x = layers.Conv2D(3, 7, padding='same', activation='tanh')(x)
+        x = layers.Conv2D(3, 7, padding='same', activation='tanh', dtype='float32')(x)
         
         return Model([noise, label], x, name='generator')
     
@@ -71,7 +83,7 @@ class DisasterGAN:
         x = layers.Dense(1024)(combined)
         x = layers.LeakyReLU(0.2)(x)
         x = layers.Dropout(0.3)(x)
-        validity = layers.Dense(1, activation='sigmoid')(x)
+        validity = layers.Dense(1, activation='sigmoid', dtype='float32')(x)
         
         return Model([img, label], validity, name='discriminator')
     
@@ -95,28 +107,101 @@ class DisasterGAN:
         return gan
     
     def train(self, X_train, y_train, epochs, batch_size=32):
-        """Train the GAN"""
-        valid = np.ones((batch_size, 1))
-        fake = np.zeros((batch_size, 1))
-        
-        for epoch in range(epochs):
-            # Train discriminator
-            idx = np.random.randint(0, X_train.shape[0], batch_size)
-            real_imgs, labels = X_train[idx], y_train[idx]
-            noise = np.random.normal(0, 1, (batch_size, self.config['latent_dim']))
-            gen_imgs = self.generator.predict([noise, labels])
+        """
+        Train the GAN with a compiled GradientTape step
+        Args:
+            X_train: Real images in [-1, 1] (array), or a tf.data.Dataset of
+                unbatched (image, label) pairs, e.g. from ShardedInputPipeline
+            y_train: Corresponding labels (ignored when X_train is a Dataset)
+            epochs: Number of training iterations
+            batch_size: Images per iteration
+        """
+        dataset = self._real_image_dataset(X_train, y_train, batch_size)
+        train_step = self._build_train_step()
+        log_every = self.config.get('log_every', 100)
+        
+        start = time.perf_counter()
+        for epoch, (real_imgs, labels) in enumerate(dataset.take(epochs)):
+            d_loss, d_acc, g_loss = train_step(real_imgs, labels)
             
-            d_loss_real = self.discriminator.train_on_batch([real_imgs, labels], valid)
-            d_loss_fake = self.discriminator.train_on_batch([gen_imgs, labels], fake)
-            d_loss = 0.5 * np.add(d_loss_real, d_loss_fake)
+            if epoch % log_every == 0:
+                # Reading the losses syncs the device, so timing stays honest
+                d_loss, d_acc, g_loss = float(d_loss), float(d_acc), float(g_loss)
+                elapsed = time.perf_counter() - start
+                steps = log_every if epoch else 1
+                print(f"Epoch {epoch} [D loss: {d_loss} | D acc: {100*d_acc}] [G loss: {g_loss}] "
+                      f"[{steps / elapsed:.2f} steps/sec]")
+                start = time.perf_counter()
+    
+    def _real_image_dataset(self, X_train, y_train, batch_size):
+        """Shuffled, repeating, prefetched batches of real images and labels"""
+        if isinstance(X_train, tf.data.Dataset):
+            dataset = X_train
+            buffer = 10000
+        else:
+            dataset = tf.data.Dataset.from_tensor_slices(
+                (X_train, np.asarray(y_train, dtype='int32'))
+            )
+            buffer = min(len(X_train), 10000)
+        
+        return (dataset
+                .map(lambda img, lbl: (tf.cast(img, tf.float32), tf.reshape(tf.cast(lbl, tf.int32), (1,))),
+                     num_parallel_calls=tf.data.AUTOTUNE)
+                .shuffle(buffer)
+                .repeat()
+                .batch(batch_size, drop_remainder=True)
+                .prefetch(tf.data.AUTOTUNE))
+    
+    def _build_train_step(self):
+        """Create optimizers and the tf.function-compiled step for both networks"""
+        # The combined gan model freezes the discriminator for train_on_batch;
+        # the custom step updates both variable sets explicitly
+        self.discriminator.trainable = True
+        
+        d_optimizer = tf.keras.optimizers.Adam(self.config['d_lr'])
+        g_optimizer = tf.keras.optimizers.Adam(self.config['g_lr'])
+        mixed = self.config.get('mixed_precision', False)
+        if mixed:
+            d_optimizer = tf.keras.mixed_precision.LossScaleOptimizer(d_optimizer)
+            g_optimizer = tf.keras.mixed_precision.LossScaleOptimizer(g_optimizer)
+        
+        bce = tf.keras.losses.BinaryCrossentropy()
+        latent_dim = self.config['latent_dim']
+        
+        def apply(optimizer, tape, loss, variables):
+            if mixed:
+                # apply_gradients unscales (and skips non-finite steps)
+                grads = tape.gradient(optimizer.scale_loss(loss), variables)
+            else:
+                grads = tape.gradient(loss, variables)
+            optimizer.apply_gradients(zip(grads, variables))
+        
+        @tf.function(jit_compile=self.config.get('xla', False))
+        def train_step(real_imgs, labels):
+            batch_size = tf.shape(real_imgs)[0]
+            noise = tf.random.normal((batch_size, latent_dim))
+            valid = tf.ones((batch_size, 1))
+            fake = tf.zeros((batch_size, 1))
             
-            # Train generator
-            noise = np.random.normal(0, 1, (batch_size, self.config['latent_dim']))
-            sampled_labels = np.random.randint(0, self.config['disaster_classes'], batch_size)
-            g_loss = self.gan.train_on_batch([noise, sampled_labels], valid)
+            # One generator forward pass feeds both updates
+            with tf.GradientTape() as d_tape, tf.GradientTape() as g_tape:
+                gen_imgs = self.generator([noise, labels], training=True)
+                real_validity = self.discriminator([real_imgs, labels], training=True)
+                fake_validity = self.discriminator([gen_imgs, labels], training=True)
+                
+                d_loss = 0.5 * (bce(valid, real_validity) + bce(fake, fake_validity))
+                g_loss = bce(valid, fake_validity)
             
-            if epoch % 100 == 0:
-                print(f"Epoch {epoch} [D loss: {d_loss[0]} | D acc: {100*d_loss[1]}] [G loss: {g_loss}]")
+            apply(d_optimizer, d_tape, d_loss, self.discriminator.trainable_variables)
+            apply(g_optimizer, g_tape, g_loss, self.generator.trainable_variables)
+            
+            d_acc = 0.5 * (
+                tf.reduce_mean(tf.cast(real_validity > 0.5, tf.float32)) +
+                tf.reduce_mean(tf.cast(fake_validity <= 0.5, tf.float32))
+            )
+            return d_loss, d_acc, g_loss
+        
+        return train_step
     
     def generate_samples(self, num_samples, label):
         """Generate synthetic disaster images"""
@@ -140,30 +225,110 @@ class DisasterGAN:
         processed = tf.image.resize(processed, self.config['img_shape'][:2])
         return processed, labels
 
-    def augment_dataset(self, X_train, y_train, samples_per_class=1000):
+    def augment_dataset(self, X_train, y_train, samples_per_class=1000, output_path=None, batch_size=None):
         """
         Generate synthetic samples to balance dataset
         Args:
             X_train: Existing training images
             y_train: Corresponding labels
             samples_per_class: Target samples per disaster class
+            output_path: Optional .npy path; the augmented images are written to a
+                memory-mapped array there instead of RAM (labels go to '<stem>_labels.npy')
+            batch_size: Synthetic images generated per generator call
+        Returns:
+            Augmented dataset with synthetic samples (float32 images: generator
+            output is tanh, so an integer dtype would truncate it)
+        """
+        deficits = self._class_deficits(y_train, samples_per_class)
+        total = len(X_train) + sum(deficits.values())
+        shape = (total,) + tuple(X_train.shape[1:])
+        
+        # Preallocate the output once and fill it batch by batch, so peak memory
+        # is the original data plus the output rather than three copies
+        if output_path:
+            images = np.lib.format.open_memmap(output_path, mode='w+', dtype='float32', shape=shape)
+            labels = np.lib.format.open_memmap(
+                os.path.splitext(output_path)[0] + '_labels.npy',
+                mode='w+', dtype=np.asarray(y_train).dtype, shape=(total,)
+            )
+        else:
+            images = np.empty(shape, dtype='float32')
+            labels = np.empty(total, dtype=np.asarray(y_train).dtype)
+        
+        images[:len(X_train)] = X_train
+        labels[:len(X_train)] = y_train
+        
+        offset = len(X_train)
+        for batch, batch_labels in self.synthetic_batches(deficits, batch_size):
+            images[offset:offset + len(batch)] = batch
+            labels[offset:offset + len(batch)] = batch_labels
+            offset += len(batch)
+        
+        if output_path:
+            images.flush()
+            labels.flush()
+        return images, labels
+    
+    def augmented_dataset(self, X_train, y_train, samples_per_class=1000, batch_size=None):
+        """
+        Stream the balanced dataset without materializing synthetic images
+        Args:
+            X_train: Existing training images
+            y_train: Corresponding labels
+            samples_per_class: Target samples per disaster class
+            batch_size: Synthetic images generated per generator call
         Returns:
-            Augmented dataset with synthetic samples
+            Unbatched tf.data.Dataset of (image, label); synthetic images are
+            generated on demand as the dataset is iterated
         """
-        class_counts = np.bincount(y_train)
-        augmented_images, augmented_labels = [], []
-        
-        for class_id in range(self.config['disaster_classes']):
-            deficit = samples_per_class - class_counts[class_id]
-            if deficit > 0:
-                synthetic = self.generate_samples(deficit, class_id)
-                augmented_images.extend(synthetic)
-                augmented_labels.extend([class_id]*deficit)
-        
-        return (
-            np.concatenate([X_train, augmented_images]),
-            np.concatenate([y_train, augmented_labels])
+        deficits = self._class_deficits(y_train, samples_per_class)
+        img_shape = tuple(X_train.shape[1:])
+        signature = (
+            tf.TensorSpec(shape=(None,) + img_shape, dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.int32)
         )
+        
+        # Real images are read slice by slice, so a memmapped X_train is never
+        # copied in full (neither as float32 nor as a TF constant)
+        chunk = batch_size or self.config['batch_size']
+        def real_batches():
+            for start in range(0, len(X_train), chunk):
+                yield (np.asarray(X_train[start:start + chunk], dtype='float32'),
+                       np.asarray(y_train[start:start + chunk], dtype='int32'))
+        
+        real = tf.data.Dataset.from_generator(real_batches, output_signature=signature).unbatch()
+        synthetic = tf.data.Dataset.from_generator(
+            lambda: self.synthetic_batches(deficits, batch_size),
+            output_signature=signature
+        ).unbatch()
+        return real.concatenate(synthetic)
+    
+    def synthetic_batches(self, deficits, batch_size=None):
+        """
+        Yield synthetic (images, labels) batches until every class deficit is filled
+        Args:
+            deficits: {class_id: number_of_samples_to_generate}
+            batch_size: Images per generator call (defaults to config batch_size)
+        """
+        batch_size = batch_size or self.config['batch_size']
+        for class_id, deficit in deficits.items():
+            for start in range(0, deficit, batch_size):
+                n = min(batch_size, deficit - start)
+                noise = tf.random.normal((n, self.config['latent_dim']))
+                labels = np.full((n, 1), class_id, dtype='int32')
+                images = self.generator([noise, labels], training=False)
+                yield np.asarray(images, dtype='float32'), labels.reshape(-1)
+    
+    def _class_deficits(self, y_train, samples_per_class):
+        """Number of synthetic samples needed per class to reach samples_per_class"""
+        class_counts = np.bincount(
+            np.asarray(y_train, dtype='int64'), minlength=self.config['disaster_classes']
+        )
+        return {
+            class_id: int(samples_per_class - class_counts[class_id])
+            for class_id in range(self.config['disaster_classes'])
+            if samples_per_class > class_counts[class_id]
+        }
 
     def deploy_to_vertex(self, vertex_service, region='us-central1'):
         """
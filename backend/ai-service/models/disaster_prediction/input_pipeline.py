@@ -0,0 +1,248 @@
+# ai-service/models/disaster_prediction/input_pipeline.py
+import functools
+import os
+import numpy as np
+import tensorflow as tf
+import pyarrow.fs as pafs
+import pyarrow.parquet as pq
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Dict, List, Optional, Tuple, Union
+
+class ShardedInputPipeline:
+    def __init__(self, config=None):
+        """
+        Streaming tf.data input layer for training on sharded datasets
+        that do not fit in memory (Parquet sensor readings, TFRecord imagery)
+
+        Args:
+            config (dict): Configuration parameters
+        """
+        self.config = config or {
+            'sequence_length': 24,          # Must match DisasterPredictionLSTM
+            'feature_columns': [
+                'temperature',
+                'humidity',
+                'rainfall',
+                'wind_speed',
+                'pressure'
+            ],
+            'target_column': 'disaster_occurred',
+            'station_column': 'station_id',
+            'timestamp_column': 'timestamp',
+            'image_shape': (256, 256, 3),   # Must match SatelliteImageCNN
+            'read_batch_rows': 65536,       # Parquet rows decoded per read
+            'cycle_length': 4,              # Shards read concurrently
+            'shuffle_buffer': 10000,        # Windows held for shuffling
+            'batch_size': 32,
+            'seed': 42
+        }
+
+    def sequence_dataset(self,
+                         sources: Union[str, List[str]],
+                         normalization: Optional[Dict] = None,
+                         sequence_length: Optional[int] = None,
+                         batch_size: Optional[int] = None,
+                         shuffle: bool = True) -> tf.data.Dataset:
+        """
+        Stream sliding windows from Parquet shards of sensor readings
+        Args:
+            sources: Glob pattern(s) or shard paths (local or gs://), e.g.
+                the parquet files written by GCPService.backup_disaster_data.
+                Rows are expected in time order per station within a shard.
+            normalization: {column: (mean, std)} from fit_normalization()
+            sequence_length: Window length (defaults to config)
+            batch_size: Batch size (defaults to config)
+            shuffle: Shuffle shard order and windows
+        Returns:
+            Batched dataset of (windows [batch, sequence_length, features], labels [batch, 1])
+        """
+        shards = self._resolve_shards(sources)
+        sequence_length = sequence_length or self.config['sequence_length']
+        n_features = len(self.config['feature_columns'])
+
+        generator = functools.partial(
+            self._parquet_windows,
+            sequence_length=sequence_length,
+            normalization=self._normalization_arrays(normalization)
+        )
+        signature = (
+            tf.TensorSpec(shape=(None, sequence_length, n_features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None, 1), dtype=tf.float32)
+        )
+
+        files = tf.data.Dataset.from_tensor_slices(shards)
+        if shuffle:
+            files = files.shuffle(len(shards), seed=self.config['seed'])
+
+        # Each shard yields window chunks which are unbatched into single windows
+        dataset = files.interleave(
+            lambda path: tf.data.Dataset.from_generator(
+                generator, args=(path,), output_signature=signature
+            ).unbatch(),
+            cycle_length=self.config['cycle_length'],
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=not shuffle
+        )
+        return self._finalize(dataset, batch_size, shuffle)
+
+    def image_dataset(self,
+                      sources: Union[str, List[str]],
+                      image_shape: Optional[Tuple] = None,
+                      batch_size: Optional[int] = None,
+                      shuffle: bool = True) -> tf.data.Dataset:
+        """
+        Stream labelled images from TFRecord shards
+        Args:
+            sources: Glob pattern(s) or shard paths (local or gs://). Records
+                hold an encoded 'image' (JPEG/PNG bytes) and an int64 'label'.
+            image_shape: Target (height, width, channels) (defaults to config)
+            batch_size: Batch size (defaults to config)
+            shuffle: Shuffle shard order and images
+        Returns:
+            Batched dataset of (images scaled to [0, 1], labels)
+        """
+        shards = self._resolve_shards(sources)
+        image_shape = tuple(image_shape or self.config['image_shape'])
+        feature_spec = {
+            'image': tf.io.FixedLenFeature([], tf.string),
+            'label': tf.io.FixedLenFeature([], tf.int64)
+        }
+
+        def parse(record):
+            example = tf.io.parse_single_example(record, feature_spec)
+            image = tf.io.decode_image(
+                example['image'], channels=image_shape[2], expand_animations=False
+            )
+            image = tf.image.resize(image, image_shape[:2]) / 255.0
+            return image, example['label']
+
+        files = tf.data.Dataset.from_tensor_slices(shards)
+        if shuffle:
+            files = files.shuffle(len(shards), seed=self.config['seed'])
+
+        dataset = files.interleave(
+            tf.data.TFRecordDataset,
+            cycle_length=self.config['cycle_length'],
+            num_parallel_calls=tf.data.AUTOTUNE,
+            deterministic=not shuffle
+        )
+        dataset = dataset.map(parse, num_parallel_calls=tf.data.AUTOTUNE)
+        return self._finalize(dataset, batch_size, shuffle)
+
+    def fit_normalization(self, sources: Union[str, List[str]]) -> Dict:
+        """
+        Compute per-feature mean/std in a single streaming pass over the shards
+        Args:
+            sources: Glob pattern(s) or shard paths
+        Returns:
+            {column: (mean, std)} for use with sequence_dataset()
+        """
+        features = list(self.config['feature_columns'])
+        count = 0
+        total = np.zeros(len(features))
+        total_sq = np.zeros(len(features))
+
+        for path in self._resolve_shards(sources):
+            with self._open_shard(path) as f:
+                parquet = pq.ParquetFile(f)
+                for batch in parquet.iter_batches(
+                    batch_size=self.config['read_batch_rows'], columns=features
+                ):
+                    values = batch.to_pandas()[features].to_numpy(dtype=np.float64)
+                    count += len(values)
+                    total += values.sum(axis=0)
+                    total_sq += np.square(values).sum(axis=0)
+
+        if count == 0:
+            raise ValueError("No rows found in the provided shards")
+
+        mean = total / count
+        std = np.sqrt(np.maximum(total_sq / count - np.square(mean), 0))
+        return {
+            col: (float(mean[i]), float(std[i]) or 1.0)
+            for i, col in enumerate(features)
+        }
+
+    def _parquet_windows(self, path, sequence_length, normalization):
+        """Yield chunks of (windows, labels) from one Parquet shard"""
+        path = path.decode('utf-8') if isinstance(path, bytes) else path
+        features = list(self.config['feature_columns'])
+        target = self.config['target_column']
+        station_col = self.config['station_column']
+        ts_col = self.config['timestamp_column']
+        mean, std = normalization
+
+        # Last sequence_length rows per station, so windows span read batches
+        carry = {}
+
+        with self._open_shard(path) as f:
+            parquet = pq.ParquetFile(f)
+            for batch in parquet.iter_batches(
+                batch_size=self.config['read_batch_rows'],
+                columns=features + [target, station_col, ts_col]
+            ):
+                frame = batch.to_pandas().sort_values([station_col, ts_col], kind='stable')
+
+                for station, rows in frame.groupby(station_col, sort=False):
+                    values = (rows[features].to_numpy(dtype=np.float32) - mean) / std
+                    labels = rows[target].to_numpy(dtype=np.float32)
+
+                    if station in carry:
+                        prev_values, prev_labels = carry[station]
+                        values = np.concatenate([prev_values, values])
+                        labels = np.concatenate([prev_labels, labels])
+
+                    if len(values) > sequence_length:
+                        # Window i covers rows [i, i + sequence_length) and is
+                        # labelled with the row that follows it
+                        windows = sliding_window_view(
+                            values[:-1], sequence_length, axis=0
+                        ).transpose(0, 2, 1)
+                        yield (
+                            np.ascontiguousarray(windows),
+                            labels[sequence_length:].reshape(-1, 1)
+                        )
+
+                    carry[station] = (values[-sequence_length:], labels[-sequence_length:])
+
+    def _normalization_arrays(self, normalization):
+        """Convert {column: (mean, std)} into broadcastable arrays"""
+        n_features = len(self.config['feature_columns'])
+        if not normalization:
+            return np.zeros(n_features, dtype=np.float32), np.ones(n_features, dtype=np.float32)
+
+        stats = np.array(
+            [normalization.get(col, (0.0, 1.0)) for col in self.config['feature_columns']],
+            dtype=np.float32
+        )
+        return stats[:, 0], np.where(stats[:, 1] == 0, 1.0, stats[:, 1]).astype(np.float32)
+
+    def _open_shard(self, path):
+        """Open a local or remote (gs://, s3://) shard as a pyarrow input file"""
+        if '://' not in path:
+            path = os.path.abspath(path)
+        filesystem, shard_path = pafs.FileSystem.from_uri(path)
+        return filesystem.open_input_file(shard_path)
+
+    def _resolve_shards(self, sources):
+        """Expand glob patterns into a sorted list of shard paths"""
+        if isinstance(sources, str):
+            sources = [sources]
+
+        shards = []
+        for pattern in sources:
+            shards.extend(sorted(tf.io.gfile.glob(pattern)))
+
+        if not shards:
+            raise ValueError(f"No shards matched: {sources}")
+        return shards
+
+    def _finalize(self, dataset, batch_size, shuffle):
+        """Apply shuffle buffer, batching and prefetch"""
+        if shuffle:
+            dataset = dataset.shuffle(
+                self.config['shuffle_buffer'],
+                seed=self.config['seed'],
+                reshuffle_each_iteration=True
+            )
+        return dataset.batch(batch_size or self.config['batch_size']).prefetch(tf.data.AUTOTUNE)
@@ -3,6 +3,9 @@ from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout, BatchNormalization
 import numpy as np
 import pandas as pd
+import json
+import os
+from models.disaster_prediction.input_pipeline import ShardedInputPipeline
 
 class DisasterPredictionLSTM:
     def __init__(self, config=None):
@@ -22,6 +25,8 @@ class DisasterPredictionLSTM:
             'epochs': 50
         }
         self.model = self._build_model()
+        # {'feature_columns', 'mean', 'std'} when trained on z-scored shards
+        self.normalization = None
         
     def _build_model(self):
         """Build and compile the LSTM model"""
@@ -85,6 +90,56 @@ class DisasterPredictionLSTM:
         
         return history
     
+    def train_from_shards(self, train_sources, val_sources=None, input_pipeline=None, normalization=None):
+        """
+        Train on Parquet shards streamed through tf.data instead of in-memory arrays
+        
+        Args:
+            train_sources: Glob pattern(s) or paths of training Parquet shards
+            val_sources: Glob pattern(s) or paths of validation Parquet shards
+            input_pipeline: ShardedInputPipeline (defaults to a new instance)
+            normalization: {column: (mean, std)}; computed from train_sources if omitted
+        
+        Returns:
+            History object containing training metrics
+        """
+        pipeline = input_pipeline or ShardedInputPipeline()
+        if len(pipeline.config['feature_columns']) != self.config['features']:
+            raise ValueError("Input pipeline feature_columns do not match model features")
+        
+        if normalization is None:
+            normalization = pipeline.fit_normalization(train_sources)
+        mean, std = pipeline._normalization_arrays(normalization)
+        self.normalization = {
+            'feature_columns': list(pipeline.config['feature_columns']),
+            'mean': mean.tolist(),
+            'std': std.tolist()
+        }
+        
+        def make_dataset(sources, shuffle):
+            return pipeline.sequence_dataset(
+                sources,
+                normalization=normalization,
+                sequence_length=self.config['sequence_length'],
+                batch_size=self.config['batch_size'],
+                shuffle=shuffle
+            )
+        
+        callbacks = [
+            tf.keras.callbacks.EarlyStopping(patience=10, restore_best_weights=True),
+            tf.keras.callbacks.ReduceLROnPlateau(factor=0.5, patience=5)
+        ]
+        
+        history = self.model.fit(
+            make_dataset(train_sources, shuffle=True),
+            epochs=self.config['epochs'],
+            validation_data=make_dataset(val_sources, shuffle=False) if val_sources else None,
+            callbacks=callbacks,
+            verbose=1
+        )
+        
+        return history
+    
     def predict(self, X):
         """
         Make predictions using the trained model
@@ -97,6 +152,44 @@ class DisasterPredictionLSTM:
         """
         return self.model.predict(X)
     
+    def predict_batch(self, X):
+        """
+        Score many stations with as few forward passes as possible
+        
+        Unlike predict(), which iterates over Keras mini-batches, the whole
+        input runs through predict_on_batch in chunks of 'inference_batch_size'
+        (a single pass for typical multi-station payloads).
+        
+        Args:
+            X: Input features (shape: [stations, sequence_length, features])
+        
+        Returns:
+            1-D array of disaster probabilities, one per station
+        
+        Raw readings are z-scored with self.normalization (set when the model
+        was trained with train_from_shards), matching what the model saw in training.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        expected = (self.config['sequence_length'], self.config['features'])
+        if X.ndim != 3 or X.shape[1:] != expected:
+            raise ValueError(f"Expected input of shape [stations, {expected[0]}, {expected[1]}], got {list(X.shape)}")
+        X = self._normalize(X)
+        
+        chunk = self.config.get('inference_batch_size', 8192)
+        outputs = [
+            np.asarray(self.model.predict_on_batch(X[start:start + chunk])).reshape(-1)
+            for start in range(0, len(X), chunk)
+        ]
+        return np.concatenate(outputs) if outputs else np.empty(0, dtype=np.float32)
+    
+    def _normalize(self, X):
+        """Apply the training-time z-score to raw readings (no-op if none was used)"""
+        if self.normalization is None:
+            return X
+        mean = np.asarray(self.normalization['mean'], dtype=np.float32)
+        std = np.asarray(self.normalization['std'], dtype=np.float32)
+        return (X - mean) / std
+    
     def evaluate(self, X_test, y_test):
         """
         Evaluate model on test data
@@ -115,16 +208,27 @@ class DisasterPredictionLSTM:
         return metrics
     
     def save(self, filepath):
-        """Save model to disk"""
+        """Save model to disk (plus its input normalization, if any)"""
         self.model.save(filepath)
+        if self.normalization is not None:
+            with open(self._normalization_path(filepath), 'w') as f:
+                json.dump(self.normalization, f)
     
     @classmethod
     def load(cls, filepath):
         """Load model from disk"""
         instance = cls()
         instance.model = tf.keras.models.load_model(filepath)
+        normalization_path = cls._normalization_path(filepath)
+        if os.path.exists(normalization_path):
+            with open(normalization_path, 'r') as f:
+                instance.normalization = json.load(f)
         return instance
     
+    @staticmethod
+    def _normalization_path(filepath):
+        return f'{os.path.splitext(filepath.rstrip(os.sep))[0]}_normalization.json'
+    
     def preprocess_data(self, data, target_column=None):
         """
         Preprocess raw data for LSTM input
@@ -0,0 +1,162 @@
+# ai-service/models/disaster_prediction/sample_bank.py
+import json
+import logging
+import os
+import threading
+import numpy as np
+import tensorflow as tf
+from datetime import datetime
+from typing import Optional
+
+class SyntheticSampleBank:
+    def __init__(self, gan, config=None):
+        """
+        Memory-mapped store of pre-generated DisasterGAN images per disaster class,
+        refreshed in the background and sampled without running the generator
+
+        Args:
+            gan: Trained DisasterGAN instance
+            config (dict): Configuration parameters
+        """
+        self.gan = gan
+        self.config = config or {
+            'directory': 'models/gan_sample_bank',
+            'samples_per_class': 2000,    # Bank capacity per class
+            'refresh_fraction': 0.05,     # Share of each class replaced per refresh
+            'refresh_interval': 300,      # Seconds between background refreshes
+            'batch_size': 64,             # Images per generator call
+            'seed': None
+        }
+        self.img_shape = tuple(self.gan.config['img_shape'])
+        self.index = {}
+        self._banks = {}
+        self._locks = {
+            class_id: threading.Lock()
+            for class_id in range(self.gan.config['disaster_classes'])
+        }
+        # Generators are not thread-safe: each class samples from its own,
+        # used only under that class's lock, and refreshing has a separate one
+        seeds = np.random.SeedSequence(self.config.get('seed')).spawn(len(self._locks) + 1)
+        self._rngs = {
+            class_id: np.random.default_rng(seed)
+            for class_id, seed in zip(self._locks, seeds)
+        }
+        self._refresh_rng = np.random.default_rng(seeds[-1])
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+        self.logger = logging.getLogger('sample_bank')
+
+    def build(self):
+        """Generate every slot of the bank, or reopen an existing one from disk"""
+        os.makedirs(self.config['directory'], exist_ok=True)
+        index_path = os.path.join(self.config['directory'], 'index.json')
+        if os.path.exists(index_path):
+            with open(index_path, 'r') as f:
+                self.index = {int(k): v for k, v in json.load(f).items()}
+
+        capacity = self.config['samples_per_class']
+        for class_id in self._locks:
+            path = os.path.join(self.config['directory'], f'class_{class_id}.npy')
+            entry = self.index.get(class_id)
+
+            if entry and entry['capacity'] == capacity and os.path.exists(path):
+                self._banks[class_id] = np.load(path, mmap_mode='r+')
+                continue
+
+            self._banks[class_id] = np.lib.format.open_memmap(
+                path, mode='w+', dtype=np.uint8, shape=(capacity,) + self.img_shape
+            )
+            self._fill(class_id, np.arange(capacity))
+            self.index[class_id] = {
+                'file': os.path.basename(path),
+                'capacity': capacity,
+                'refreshes': 0,
+                'updated_at': datetime.now().isoformat()
+            }
+
+        self._save_index()
+        return self
+
+    def sample(self, label: int, num_samples: int, as_float: bool = True) -> np.ndarray:
+        """
+        Draw random images for a class from the bank
+        Args:
+            label: Disaster class id
+            num_samples: Number of images to draw (with replacement)
+            as_float: Scale to the generator's [-1, 1] range instead of uint8
+        Returns:
+            Array of shape [num_samples, *img_shape]
+        """
+        if label not in self._banks:
+            raise KeyError(f"Sample bank has no class {label}; call build() first")
+
+        bank = self._banks[label]
+        with self._locks[label]:
+            idx = np.sort(self._rngs[label].integers(0, len(bank), size=num_samples))
+            images = bank[idx]
+
+        if as_float:
+            return images.astype(np.float32) / 127.5 - 1.0
+        return images
+
+    def refresh(self, class_ids=None):
+        """
+        Replace a random fraction of each class's slots with fresh generator output
+        Args:
+            class_ids: Classes to refresh (defaults to all)
+        """
+        capacity = self.config['samples_per_class']
+        n = max(1, int(capacity * self.config['refresh_fraction']))
+
+        for class_id in (class_ids if class_ids is not None else list(self._banks)):
+            slots = self._refresh_rng.choice(capacity, size=min(n, capacity), replace=False)
+            self._fill(class_id, np.sort(slots))
+            self.index[class_id]['refreshes'] += 1
+            self.index[class_id]['updated_at'] = datetime.now().isoformat()
+
+        self._save_index()
+
+    def start_refresh(self):
+        """Start refreshing the bank on a background thread"""
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return
+
+        def run():
+            while not self._stop_event.wait(self.config['refresh_interval']):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    self.logger.error(f"Sample bank refresh failed: {str(e)}")
+
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(target=run, name='sample-bank-refresh', daemon=True)
+        self._refresh_thread.start()
+
+    def stop_refresh(self, timeout: Optional[float] = None):
+        """Stop the background refresh thread"""
+        self._stop_event.set()
+        if self._refresh_thread:
+            self._refresh_thread.join(timeout)
+            self._refresh_thread = None
+
+    def _fill(self, class_id, slots):
+        """Generate images for the given slots; only the copy into the bank holds the lock"""
+        batch_size = self.config['batch_size']
+        bank = self._banks[class_id]
+
+        for start in range(0, len(slots), batch_size):
+            batch_slots = slots[start:start + batch_size]
+            noise = tf.random.normal((len(batch_slots), self.gan.config['latent_dim']))
+            labels = np.full((len(batch_slots), 1), class_id, dtype='int32')
+            images = np.asarray(self.gan.generator([noise, labels], training=False))
+            images = np.clip(np.rint((images + 1.0) * 127.5), 0, 255).astype(np.uint8)
+
+            with self._locks[class_id]:
+                bank[batch_slots] = images
+
+        bank.flush()
+
+    def _save_index(self):
+        """Persist the per-class index next to the bank files"""
+        with open(os.path.join(self.config['directory'], 'index.json'), 'w') as f:
+            json.dump({str(k): v for k, v in self.index.items()}, f)
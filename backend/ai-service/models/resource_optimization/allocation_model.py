@@ -3,8 +3,42 @@ import numpy as np
 import pandas as pd
 from ortools.linear_solver import pywraplp
 from typing import Dict, List, Tuple
+import copy
+import hashlib
 import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from models.resource_optimization.solver_pool import SolverPool, SOLVER_BACKENDS, STATUS_NAMES
+from models.resource_optimization.routing_model import FleetRouter
+from models.resource_optimization.stochastic_allocation import TwoStageAllocator
+
+# Per-process state for sweep_scenarios() workers
+_scenario_allocator = None
+_scenario_locations = None
+
+def _init_scenario_worker(config, locations):
+    """Each worker process builds one allocator (own solver pool and network cache)"""
+    global _scenario_allocator, _scenario_locations
+    _scenario_allocator = ResourceAllocator(config)
+    _scenario_locations = locations
+
+def _solve_scenario(args):
+    """
+    Solve one demand scenario (module-level so process pools can pickle it).
+    Uses the shortfall model so stock that cannot cover a scenario shows up as
+    partial fulfillment rather than an infeasible solve.
+    """
+    name, demands, backend = args
+    site = {'id': 'disaster_site', 'position': _scenario_locations['disaster_site'], 'demands': demands}
+    try:
+        plan = _scenario_allocator.optimize_multi_site([site], _scenario_locations['warehouses'], backend)
+        return name, plan, None
+    except RuntimeError as e:
+        return name, None, str(e)
 
 class ResourceAllocator:
     def __init__(self, config=None):
@@ -33,11 +67,48 @@ class ResourceAllocator:
                 'essential': 1.1,
                 'standard': 1.0
             },
-            'max_response_time': 24  # Hours
+            'max_response_time': 24,  # Hours
+            'solver': {
+                'backend': 'SCIP',       # 'SCIP', 'CBC', 'GLOP' (LP relaxation) or 'CP-SAT'
+                'pool_size': 4,          # Warm instances kept for concurrent requests
+                'time_limit_ms': 10000,  # Hard budget per solve (0 = none)
+                'accept_feasible': True, # Return the incumbent when the budget runs out
+                'fallback': 'greedy'     # Heuristic plan when no solution is found in time (None = raise)
+            },
+            'network_cache_size': 32,  # Distance/travel-time matrices kept per warehouse layout
+            'shortfall_penalty': 100,  # Per unit of unmet demand, scaled by site and resource priority
+            'scenario_workers': None,  # Processes for sweep_scenarios() (None = CPU count)
+            'stochastic': {
+                'preposition_cost': 0.2,  # Per unit moved to a staging hub ahead of time
+                'max_iterations': 100,
+                'tolerance': 1e-4
+            },
+            'routing': {
+                'first_solution_strategy': 'PATH_CHEAPEST_ARC',
+                'local_search_metaheuristic': 'GUIDED_LOCAL_SEARCH',
+                'time_limit_ms': 500,
+                'service_minutes': 10,
+                'drop_penalty': 10000000
+            }
         }
-        self.solver = pywraplp.Solver.CreateSolver('SCIP')
+        # A partial 'solver' config (e.g. {'backend': 'CBC'}) keeps the other defaults
+        solver_config = {'backend': 'SCIP', 'pool_size': 4, **(self.config.get('solver') or {})}
+        self.solver_pool = SolverPool(solver_config['backend'], solver_config['pool_size'])
+        self._solve_local = threading.local()  # Per-thread last_solve_stats
+        self._network_cache = OrderedDict()
+        self._network_lock = threading.Lock()
+        self.router = FleetRouter(self.config.get('routing'))
+        self.two_stage = TwoStageAllocator(self, self.config.get('stochastic'))
+        self._incremental = None  # Model kept by optimize_incremental() for reoptimize()
+        self._incremental_lock = threading.Lock()
+    
+    @property
+    def last_solve_stats(self) -> Dict:
+        """Stats of the last solve made by the calling thread (plans carry their own in 'solver_stats')"""
+        return getattr(self._solve_local, 'stats', {})
         
-    def optimize_transport(self, demands: Dict, locations: Dict) -> Dict:
+    def optimize_transport(self, demands: Dict, locations: Dict, backend: str = None,
+                           time_limit_ms: int = None, columnar: bool = False) -> Dict:
         """
         Solve transportation problem for resource allocation
         Args:
@@ -48,24 +119,183 @@ class ResourceAllocator:
                 ],
                 'disaster_site': (lat, lon)
             }
+            backend: Solver backend override for this request
+            time_limit_ms: Solve budget override for this request
+            columnar: Return 'allocations' as a DataFrame (one row per nonzero arc)
+                instead of a list of dicts; much faster for large plans
+        Returns:
+            Allocation and routing plan; 'method' says whether it is 'optimal',
+            the best 'feasible' solution found in time, or the 'greedy' fallback
+        """
+        network = self._network(locations['warehouses'], [locations['disaster_site']])
+        arcs, pruning = self._prune_arcs(network, locations['warehouses'], [demands])
+        
+        # Each request builds its model on a cleared solver from the pool
+        with self.solver_pool.acquire(backend) as solver:
+            build_start = time.perf_counter()
+            transport_vars, _ = self._build_transport_model(solver, demands, locations, network, arcs)
+            
+            # Solve
+            solve_start = time.perf_counter()
+            status, method = self._solve_anytime(solver, time_limit_ms)
+            stats = self._solve_stats(solver, backend, status, build_start, solve_start, pruning)
+            
+            # Prepare results (before the solver is cleared and returned to the pool)
+            if method is not None:
+                values = np.fromiter(
+                    (var.solution_value() for var in transport_vars.values()),
+                    dtype=np.float64, count=len(transport_vars)
+                )
+            elif status != pywraplp.Solver.INFEASIBLE and self._solver_option('fallback', 'greedy') == 'greedy':
+                method = 'greedy'
+                greedy = self._greedy_allocation(network, locations, demands, arcs)
+                values = np.fromiter(
+                    (greedy.get(key, 0.0) for key in transport_vars),
+                    dtype=np.float64, count=len(transport_vars)
+                )
+            else:
+                raise RuntimeError(f"No solution found (status {stats['status']})")
+            
+            if columnar:
+                plan = self._columnar_results(arcs, values, demands, network)
+            else:
+                plan = self._prepare_results(
+                    dict(zip(transport_vars, values.tolist())), 
+                    demands, 
+                    network
+                )
+            plan['method'] = method
+            plan['solver_stats'] = stats
+            return plan
+    
+    def sweep_scenarios(self, scenarios: List[Dict], locations: Dict, backend: str = None,
+                        max_workers: int = None) -> Dict:
+        """
+        Solve demand scenarios in parallel processes and summarize how robust
+        the resulting plans are. Each scenario is solved with shortfall variables
+        (as in optimize_multi_site()), so fulfillment below 100% measures how much
+        of that scenario the current stock can cover.
+        Args:
+            scenarios: [{'name': 'p90', 'demands': {'resource_type': amount}}]
+            locations: Same layout as optimize_transport(), shared by all scenarios
+            backend: Solver backend override
+            max_workers: Worker processes (defaults to the CPU count)
         Returns:
-            Optimal allocation and routing plan
+            {
+                'scenarios': {name: summary}, 'arc_usage': [...],
+                'worst_case_fulfillment': {...}, 'cost': {...}
+            }
+        """
+        if not scenarios:
+            raise ValueError("At least one scenario is required")
+        payloads = [
+            (scenario.get('name', f'scenario_{i}'), scenario['demands'], backend)
+            for i, scenario in enumerate(scenarios)
+        ]
+        max_workers = max_workers or self.config.get('scenario_workers') or os.cpu_count() or 1
+        max_workers = max(1, min(max_workers, len(payloads)))
+        
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_scenario_worker,
+            initargs=(self.config, locations)
+        ) as executor:
+            results = list(executor.map(
+                _solve_scenario, payloads,
+                chunksize=max(1, len(payloads) // (max_workers * 4))
+            ))
+        
+        return self._summarize_scenarios(results)
+    
+    def optimize_two_stage(self, warehouses: List[Dict], hubs: List[Dict], sites: List[Dict],
+                           scenarios: List[Dict]) -> Dict:
         """
-        # Initialize variables
+        Prepositioning plan that minimizes expected cost over demand scenarios
+        (see TwoStageAllocator.solve for the argument layout)
+        """
+        return self.two_stage.solve(warehouses, hubs, sites, scenarios)
+    
+    def optimize_two_stage_saa(self, warehouses: List[Dict], hubs: List[Dict], sites: List[Dict],
+                               sample_scenarios, **kwargs) -> Dict:
+        """
+        Sample-average approximation of optimize_two_stage() for a scenario
+        generator (see TwoStageAllocator.sample_average_approximation)
+        """
+        return self.two_stage.sample_average_approximation(
+            warehouses, hubs, sites, sample_scenarios, **kwargs
+        )
+    
+    def _summarize_scenarios(self, results) -> Dict:
+        """Arc usage frequency, worst-case fulfillment, shortfalls and cost spread across scenarios"""
+        summary = {'scenarios': {}}
+        arc_quantities = defaultdict(list)
+        costs = []
+        for name, plan, error in results:
+            if plan is None:
+                summary['scenarios'][name] = {'error': error, 'fulfillment_percentage': 0.0}
+                continue
+            summary['scenarios'][name] = {
+                'method': plan['method'],
+                'total_cost': plan['total_cost'],
+                'fulfillment_percentage': plan['fulfillment_percentage'],
+                'max_arrival_time': plan['max_arrival_time'],
+                'shortfall': plan['sites']['disaster_site']['shortfall']
+            }
+            costs.append(plan['total_cost'])
+            for alloc in plan['allocations']:
+                arc_quantities[(alloc['transport_mode'], alloc['source'], alloc['resource'])].append(
+                    alloc['quantity']
+                )
+        
+        n = len(results)
+        summary['arc_usage'] = sorted(
+            (
+                {
+                    'transport_mode': mode,
+                    'source': wh_id,
+                    'resource': res,
+                    'frequency': round(len(quantities) / n, 4),
+                    'mean_quantity': float(np.sum(quantities) / n),
+                    'max_quantity': float(np.max(quantities))
+                }
+                for (mode, wh_id, res), quantities in arc_quantities.items()
+            ),
+            key=lambda arc: -arc['frequency']
+        )
+        worst = min(summary['scenarios'].items(), key=lambda item: item[1]['fulfillment_percentage'])
+        summary['worst_case_fulfillment'] = {
+            'scenario': worst[0],
+            'fulfillment_percentage': worst[1]['fulfillment_percentage']
+        }
+        summary['cost'] = {
+            'min': float(np.min(costs)),
+            'mean': float(np.mean(costs)),
+            'max': float(np.max(costs))
+        } if costs else {}
+        summary['failed'] = sum(1 for _, plan, _ in results if plan is None)
+        return summary
+    
+    def _build_transport_model(self, solver, demands, locations, network, arcs):
+        """
+        Variables, constraints and objective of the single-site model
+        Returns:
+            (transport_vars, constraints) as returned by _add_constraints()
+        """
+        # Initialize variables (feasible arcs only)
+        resources = self.config['resource_types']
         transport_vars = {}
-        for mode in self.config['transport_modes']:
-            for wh in locations['warehouses']:
-                for res in self.config['resource_types']:
-                    transport_vars[(mode, wh['id'], res)] = self.solver.IntVar(
-                        0, self.solver.infinity(), 
-                        f'{mode}_{wh["id"]}_{res}'
-                    )
+        for m, w, _, r in zip(*arcs):
+            mode, wh_id, res = network['modes'][m], network['warehouse_ids'][w], resources[r]
+            transport_vars[(mode, wh_id, res)] = solver.IntVar(
+                0, solver.infinity(), 
+                f'{mode}_{wh_id}_{res}'
+            )
         
         # Set constraints
-        self._add_constraints(transport_vars, demands, locations)
+        constraints = self._add_constraints(solver, transport_vars, demands, locations)
         
         # Set objective: Minimize (cost - priority_score)
-        objective = self.solver.Objective()
+        objective = solver.Objective()
         for var_key, var in transport_vars.items():
             mode, wh_id, res = var_key
             priority = self._get_priority_weight(res)
@@ -75,60 +305,689 @@ class ResourceAllocator:
                 cost - (priority * 0.1)  # Balance cost and priority
             )
         objective.SetMinimization()
+        return transport_vars, constraints
+    
+    def optimize_incremental(self, demands: Dict, locations: Dict, backend: str = None) -> Dict:
+        """
+        Same as optimize_transport(), but the model and solution are kept so that
+        later changes can be applied with reoptimize() instead of a cold solve
+        Args:
+            demands: {'resource_type': amount_needed}
+            locations: Same layout as optimize_transport()
+            backend: Solver backend for this and later incremental solves
+        Returns:
+            Optimal allocation plan
+        """
+        # Private copies: reoptimize() updates stock in place
+        locations = {
+            **locations,
+            'warehouses': [{**wh, 'inventory': dict(wh['inventory'])} for wh in locations['warehouses']]
+        }
+        with self._incremental_lock:
+            return self._solve_incremental(dict(demands), locations, backend or self.solver_pool.backend)
+    
+    def reoptimize(self, demands: Dict = None, inventory: Dict = None) -> Dict:
+        """
+        Apply demand/inventory changes to the kept model and re-solve, using the
+        previous solution as a hint. Only the constraints of changed keys are
+        touched; updates that change nothing return the kept plan.
+        Args:
+            demands: {'resource_type': new_amount} for changed resources only
+            inventory: {'warehouse_id': {'resource_type': new_amount}} for changed stock only
+        Returns:
+            Allocation plan plus 'diff' (allocations that changed) and 'rebuilt'
+            (True when the change needed arcs or constraints the kept model lacks)
+        """
+        with self._incremental_lock:
+            state = self._incremental
+            if state is None:
+                raise RuntimeError("No model to update: call optimize_incremental() first")
+            
+            wh_by_id = state['warehouse_by_id']
+            unknown = set(inventory or {}) - set(wh_by_id)
+            if unknown:
+                raise ValueError(f"Unknown warehouses: {sorted(unknown)}")
+            
+            # Keep only values that actually differ (duplicate RFID/demand updates are no-ops)
+            demand_changes = {
+                res: amount for res, amount in (demands or {}).items()
+                if state['demands'].get(res, 0) != amount
+            }
+            stock_changes = {
+                (wh_id, res): amount
+                for wh_id, stock in (inventory or {}).items()
+                for res, amount in stock.items()
+                if wh_by_id[wh_id]['inventory'].get(res, 0) != amount
+            }
+            if not (demand_changes or stock_changes or state['stale']):
+                return self._kept_plan(state)
+            
+            previous = state['values']
+            if state['stale'] or self._needs_rebuild(state, demand_changes, stock_changes):
+                plan = self._rebuild_incremental(state, demand_changes, stock_changes)
+            else:
+                plan = self._patch_incremental(state, demand_changes, stock_changes)
+            
+            plan['diff'] = self._allocation_diff(previous, self._incremental['values'])
+            return plan
+    
+    def _needs_rebuild(self, state, demand_changes, stock_changes) -> bool:
+        """
+        Bounds can only move within the kept model: a resource that becomes
+        demanded, or stock that becomes usable at a reachable warehouse, needs
+        variables and constraints the model was built without
+        """
+        resources = self.config['resource_types']
+        for res, amount in demand_changes.items():
+            if res in resources and amount > 0 and (
+                res not in state['constraints']['demand'] or state['demands'].get(res, 0) <= 0
+            ):
+                return True
+        
+        network = state['network']
+        for (wh_id, res), amount in stock_changes.items():
+            demanded = demand_changes.get(res, state['demands'].get(res, 0)) > 0
+            if (res in resources and amount > 0 and demanded and
+                    (wh_id, res) not in state['constraints']['capacity']):
+                w = network['warehouse_index'][wh_id]
+                if network['travel_times'][:, w, 0].min() <= self.config['max_response_time']:
+                    return True
+        return False
+    
+    def _patch_incremental(self, state, demand_changes, stock_changes) -> Dict:
+        """Move only the changed demand right-hand sides and capacity bounds"""
+        build_start = time.perf_counter()
+        undo = []
+        for res, amount in demand_changes.items():
+            ct = state['constraints']['demand'].get(res)
+            if ct is not None:
+                undo.append((ct.SetLb, ct.lb()))
+                ct.SetLb(amount)
+        for key, amount in stock_changes.items():
+            ct = state['constraints']['capacity'].get(key)
+            if ct is not None:
+                undo.append((ct.SetUb, ct.ub()))
+                ct.SetUb(amount)
+        
+        if not undo:
+            # e.g. stock moved at an unreachable warehouse: the model is unchanged,
+            # and re-solving an already solved SCIP model is an error
+            self._commit_changes(state, demand_changes, stock_changes)
+            return self._kept_plan(state)
+        
+        self._set_hint(state['solver'], state['vars'], state['values'])
+        demands = {**state['demands'], **demand_changes}
+        status, solved = self._solve_kept(state, demands, build_start)
+        if solved is None:
+            if status == pywraplp.Solver.INFEASIBLE:
+                for set_bound, bound in undo:
+                    set_bound(bound)
+                raise RuntimeError("No solution found (status INFEASIBLE)")
+            # ABNORMAL/NOT_SOLVED can leave the solver unusable: start over
+            state['stale'] = True
+            return self._rebuild_incremental(state, demand_changes, stock_changes)
+        
+        self._commit_changes(state, demand_changes, stock_changes)
+        state['values'], state['plan'] = solved
+        state['plan']['rebuilt'] = False
+        return state['plan']
+    
+    def _rebuild_incremental(self, state, demand_changes, stock_changes) -> Dict:
+        """Cold build with the changes applied, hinted with the previous solution"""
+        demands = {**state['demands'], **demand_changes}
+        warehouses = [
+            {**wh, 'inventory': dict(wh['inventory'])} for wh in state['locations']['warehouses']
+        ]
+        by_id = {wh['id']: wh for wh in warehouses}
+        for (wh_id, res), amount in stock_changes.items():
+            by_id[wh_id]['inventory'][res] = amount
+        locations = {**state['locations'], 'warehouses': warehouses}
+        
+        plan = self._solve_incremental(demands, locations, state['backend'], hint=state['values'])
+        plan['rebuilt'] = True
+        return plan
+    
+    def _solve_incremental(self, demands, locations, backend, hint=None) -> Dict:
+        """Build and solve on a dedicated solver; kept for reoptimize() only if it solves"""
+        solver = pywraplp.Solver.CreateSolver(SOLVER_BACKENDS[backend])
+        if solver is None:
+            raise RuntimeError(f"Solver backend {backend} is not available in this OR-Tools build")
+        network = self._network(locations['warehouses'], [locations['disaster_site']])
+        arcs, pruning = self._prune_arcs(network, locations['warehouses'], [demands])
+        
+        build_start = time.perf_counter()
+        transport_vars, constraints = self._build_transport_model(
+            solver, demands, locations, network, arcs
+        )
+        if hint:
+            self._set_hint(solver, transport_vars, hint)
+        
+        state = {
+            'solver': solver,
+            'backend': backend,
+            'vars': transport_vars,
+            'constraints': constraints,
+            'demands': demands,
+            'locations': locations,
+            'warehouse_by_id': {wh['id']: wh for wh in locations['warehouses']},
+            'network': network,
+            'pruning': pruning,
+            'stale': False
+        }
+        status, solved = self._solve_kept(state, demands, build_start)
+        if solved is None:
+            raise RuntimeError(f"No solution found (status {STATUS_NAMES.get(status, status)})")
+        
+        state['values'], state['plan'] = solved
+        self._incremental = state
+        return state['plan']
+    
+    def _solve_kept(self, state, demands, build_start):
+        """
+        Solve the kept model
+        Returns:
+            (status, (nonzero values, plan)) or (status, None) without a usable solution
+        """
+        solve_start = time.perf_counter()
+        status, method = self._solve_anytime(state['solver'])
+        stats = self._solve_stats(
+            state['solver'], state['backend'], status, build_start, solve_start, state['pruning']
+        )
+        if method is None:
+            return status, None
+        
+        values = {}
+        for key, var in state['vars'].items():
+            value = var.solution_value()
+            if value > 0:
+                values[key] = value
+        plan = self._prepare_results(values, demands, state['network'])
+        plan['method'] = method
+        plan['solver_stats'] = stats
+        return status, (values, plan)
+    
+    def _commit_changes(self, state, demand_changes, stock_changes):
+        """Record applied changes once the kept model reflects them"""
+        state['demands'].update(demand_changes)
+        for (wh_id, res), amount in stock_changes.items():
+            state['warehouse_by_id'][wh_id]['inventory'][res] = amount
+    
+    def _kept_plan(self, state) -> Dict:
+        """Copy of the last plan for updates that change nothing"""
+        plan = copy.deepcopy(state['plan'])
+        plan['diff'] = []
+        plan['rebuilt'] = False
+        return plan
+    
+    def _set_hint(self, solver, vars, values):
+        """Warm start from the nonzero allocations of a previous solution"""
+        keys = [key for key in values if key in vars]
+        solver.SetHint([vars[key] for key in keys], [values[key] for key in keys])
+    
+    def _allocation_diff(self, before: Dict, after: Dict) -> List[Dict]:
+        """Allocations whose quantity changed between two solutions"""
+        diff = []
+        for key in before.keys() | after.keys():
+            old, new = before.get(key, 0.0), after.get(key, 0.0)
+            if abs(new - old) > 1e-6:
+                mode, wh_id, res = key
+                diff.append({
+                    'resource': res,
+                    'source': wh_id,
+                    'transport_mode': mode,
+                    'before': old,
+                    'after': new,
+                    'change': new - old
+                })
+        return diff
+    
+    def optimize_multi_site(self, sites: List[Dict], warehouses: List[Dict], backend: str = None) -> Dict:
+        """
+        Allocate shared warehouse inventory across several disaster sites in one solve
+        Args:
+            sites: [
+                {'id': 'd1', 'position': (lat, lon), 'demands': {'resource_type': amount},
+                 'priority': 1.0}
+            ]
+            warehouses: [{'id': 'w1', 'inventory': {...}, 'position': (lat, lon)}]
+            backend: Solver backend override for this request
+        Returns:
+            Allocation plan with per-site fulfillment and shortfalls
+        """
+        network = self._network(warehouses, [site['position'] for site in sites])
+        arcs, pruning = self._prune_arcs(network, warehouses, [site['demands'] for site in sites])
+        resources = self.config['resource_types']
+        penalty = self.config.get('shortfall_penalty', 100)
+        
+        with self.solver_pool.acquire(backend) as solver:
+            build_start = time.perf_counter()
+            
+            # Only feasible arcs get variables
+            transport_vars = {}
+            for m, w, s, r in zip(*arcs):
+                mode, wh_id, site_id, res = (
+                    network['modes'][m], network['warehouse_ids'][w], sites[s]['id'], resources[r]
+                )
+                transport_vars[(mode, wh_id, site_id, res)] = solver.IntVar(
+                    0, solver.infinity(),
+                    f'{mode}_{wh_id}_{site_id}_{res}'
+                )
+            
+            # Unmet demand keeps the model feasible when sites are out of reach
+            shortfall_vars = {
+                (site['id'], res): solver.NumVar(
+                    0, site['demands'][res], f'shortfall_{site["id"]}_{res}'
+                )
+                for site in sites
+                for res in resources
+                if site['demands'].get(res, 0) > 0
+            }
+            
+            self._add_multi_site_constraints(solver, transport_vars, shortfall_vars, sites, warehouses)
+            
+            # Objective: transport cost minus priority bonus, plus shortfall weighted
+            # by site priority so scarce stock goes to the most critical sites first
+            site_priority = {site['id']: site.get('priority', 1.0) for site in sites}
+            objective = solver.Objective()
+            for (mode, wh_id, site_id, res), var in transport_vars.items():
+                priority = self._get_priority_weight(res)
+                cost = self.config['transport_modes'][mode]['cost']
+                objective.SetCoefficient(var, cost - (priority * 0.1))
+            for (site_id, res), var in shortfall_vars.items():
+                objective.SetCoefficient(
+                    var, penalty * self._get_priority_weight(res) * site_priority[site_id]
+                )
+            objective.SetMinimization()
+            
+            solve_start = time.perf_counter()
+            status, method = self._solve_anytime(solver)
+            stats = self._solve_stats(solver, backend, status, build_start, solve_start, pruning)
+            
+            if method is not None:
+                plan = self._prepare_multi_site_results(
+                    transport_vars,
+                    shortfall_vars,
+                    sites,
+                    network
+                )
+                plan['method'] = method
+                plan['solver_stats'] = stats
+                return plan
+            else:
+                raise RuntimeError(f"No solution found (status {stats['status']})")
+    
+    def _add_multi_site_constraints(self, solver, vars, shortfall_vars, sites, warehouses):
+        """Per-site demand and shared warehouse capacity over the sparse arcs"""
+        inflow = defaultdict(list)   # (site_id, res) -> vars
+        outflow = defaultdict(list)  # (wh_id, res) -> vars
+        for (mode, wh_id, site_id, res), var in vars.items():
+            inflow[(site_id, res)].append(var)
+            outflow[(wh_id, res)].append(var)
+        
+        # 1. Demand satisfaction per site (delivered + shortfall)
+        demands = {site['id']: site['demands'] for site in sites}
+        for (site_id, res), shortfall in shortfall_vars.items():
+            solver.Add(
+                solver.Sum(inflow[(site_id, res)]) + shortfall >= demands[site_id][res],
+                f'demand_{site_id}_{res}'
+            )
+        
+        # 2. Warehouse capacity shared by all sites
+        for wh in warehouses:
+            for res in self.config['resource_types']:
+                if (wh['id'], res) in outflow:
+                    solver.Add(
+                        solver.Sum(outflow[(wh['id'], res)]) <= wh['inventory'].get(res, 0),
+                        f'capacity_{wh["id"]}_{res}'
+                    )
+    
+    def _prune_arcs(self, network, warehouses, site_demands):
+        """
+        Keep only arcs that can carry useful flow: reachable within
+        max_response_time, stocked at the warehouse and demanded at the site
+        Args:
+            network: Output of _network() for these warehouses and sites
+            warehouses: Warehouse dicts, in network order
+            site_demands: {'resource_type': amount} per site, in network order
+        Returns:
+            ((mode_idx, wh_idx, site_idx, res_idx) index lists, pruning counts)
+        """
+        resources = self.config['resource_types']
+        inventory = np.array(
+            [[wh['inventory'].get(res, 0) for res in resources] for wh in warehouses],
+            dtype=np.float64
+        ).reshape(len(warehouses), len(resources))
+        demand = np.array(
+            [[d.get(res, 0) for res in resources] for d in site_demands],
+            dtype=np.float64
+        ).reshape(len(site_demands), len(resources))
+        
+        reachable = network['travel_times'] <= self.config['max_response_time']  # [M, W, S]
+        stocked = reachable[:, :, :, None] & (inventory > 0)[None, :, None, :]
+        feasible = stocked & (demand > 0)[None, None, :, :]                       # [M, W, S, R]
+        
+        candidates = feasible.size
+        n_reachable = int(reachable.sum()) * len(resources)
+        n_stocked = int(stocked.sum())
+        arcs = tuple(idx.tolist() for idx in np.nonzero(feasible))
+        pruning = {
+            'candidate_arcs': candidates,
+            'arcs': len(arcs[0]),
+            'pruned_response_time': candidates - n_reachable,
+            'pruned_zero_inventory': n_reachable - n_stocked,
+            'pruned_no_demand': n_stocked - len(arcs[0])
+        }
+        return arcs, pruning
+    
+    def plan_routes(self, allocation_plan: Dict, warehouses: List[Dict], sites: List[Dict]) -> Dict:
+        """
+        Turn an allocation plan into vehicle routes that respect fleet size,
+        vehicle capacity and each site's response deadline
+        Args:
+            allocation_plan: Output of optimize_transport() or optimize_multi_site()
+            warehouses: [{'id': 'w1', 'position': (lat, lon), 'fleet': {'truck': 3, 'drone': 10}}]
+            sites: [{'id': 'd1', 'position': (lat, lon), 'deadline': hours (optional)}]
+                (use id 'disaster_site' for optimize_transport plans)
+        Returns:
+            Multi-stop routes per vehicle plus loads that could not be served
+        """
+        modes = self.config['transport_modes']
+        wh_by_id = {wh['id']: wh for wh in warehouses}
+        site_by_id = {site['id']: site for site in sites}
+        
+        # Vehicles carry mixed cargo: merge allocations per (warehouse, site)
+        loads = defaultdict(lambda: defaultdict(float))
+        for alloc in allocation_plan['allocations']:
+            loads[(alloc['source'], alloc['destination'])][alloc['resource']] += alloc['quantity']
+        
+        depot_ids = sorted({wh_id for wh_id, _ in loads})
+        depot_index = {wh_id: i for i, wh_id in enumerate(depot_ids)}
+        vehicles = []
+        for wh_id in depot_ids:
+            for mode, count in wh_by_id[wh_id].get('fleet', {}).items():
+                for k in range(count):
+                    vehicles.append({
+                        'id': f'{wh_id}_{mode}_{k}',
+                        'depot': depot_index[wh_id],
+                        'mode': mode,
+                        'capacity': modes[mode]['capacity'],
+                        'speed': modes[mode]['speed'],
+                        'cost': modes[mode]['cost']
+                    })
+        
+        # Loads larger than the biggest vehicle at their warehouse become several stops
+        stops, manifests, unroutable = [], [], []
+        for (wh_id, site_id), manifest in loads.items():
+            capacities = [v['capacity'] for v in vehicles if v['depot'] == depot_index[wh_id]]
+            if not capacities:
+                unroutable.append({'source': wh_id, 'destination': site_id, 'load': dict(manifest)})
+                continue
+            deadline = site_by_id[site_id].get('deadline', self.config['max_response_time'])
+            for chunk in self._split_load(manifest, max(capacities)):
+                stops.append({
+                    'demand': sum(chunk.values()),
+                    'window': (0, int(deadline * 60)),
+                    'depot': depot_index[wh_id],
+                    'source': wh_id,
+                    'destination': site_id
+                })
+                manifests.append(chunk)
         
-        # Solve
-        status = self.solver.Solve()
+        plan = {
+            'routes': [],
+            'dropped': unroutable,
+            'vehicles_used': 0,
+            'total_distance_km': 0.0,
+            'timestamp': datetime.now().isoformat()
+        }
+        if not stops:
+            return plan
         
-        # Prepare results
+        positions = np.array(
+            [wh_by_id[wh_id]['position'] for wh_id in depot_ids] +
+            [site_by_id[stop['destination']]['position'] for stop in stops],
+            dtype=np.float64
+        )
+        solution = self.router.route(
+            len(depot_ids), vehicles, stops, self._haversine_matrix(positions, positions)
+        )
+        
+        for route in solution['routes']:
+            vehicle = vehicles[route['vehicle']]
+            plan['routes'].append({
+                'vehicle': vehicle['id'],
+                'source': depot_ids[vehicle['depot']],
+                'transport_mode': vehicle['mode'],
+                'stops': [
+                    {
+                        'destination': stops[s['stop']]['destination'],
+                        'load': manifests[s['stop']],
+                        'quantity': stops[s['stop']]['demand'],
+                        'estimated_hours': round(s['arrival_min'] / 60, 2)
+                    }
+                    for s in route['stops']
+                ],
+                'load': route['load'],
+                'distance_km': route['distance_km'],
+                'duration_hours': round(route['duration_min'] / 60, 2)
+            })
+            plan['total_distance_km'] += route['distance_km']
+        plan['dropped'].extend(
+            {'source': stops[i]['source'], 'destination': stops[i]['destination'], 'load': manifests[i]}
+            for i in solution['dropped']
+        )
+        plan['vehicles_used'] = len(plan['routes'])
+        plan['total_distance_km'] = round(plan['total_distance_km'], 3)
+        plan['solver_stats'] = {
+            'num_vehicles': len(vehicles),
+            'num_stops': len(stops),
+            'objective': solution['objective'],
+            'solve_ms': solution['solve_ms']
+        }
+        return plan
+    
+    def _split_load(self, manifest: Dict, capacity: int) -> List[Dict]:
+        """Split {'resource_type': quantity} into chunks of at most capacity units"""
+        chunks, current, room = [], {}, capacity
+        for res, quantity in manifest.items():
+            remaining = int(np.ceil(quantity))
+            while remaining > 0:
+                take = min(remaining, room)
+                current[res] = current.get(res, 0) + take
+                remaining -= take
+                room -= take
+                if room == 0:
+                    chunks.append(current)
+                    current, room = {}, capacity
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _solver_option(self, name, default):
+        return (self.config.get('solver') or {}).get(name, default)
+    
+    def _solve_anytime(self, solver, time_limit_ms: int = None):
+        """
+        Solve within the time budget
+        Returns:
+            (status, method) where method is 'optimal', 'feasible' (incumbent
+            accepted when the budget ran out) or None when there is no usable solution
+        """
+        if time_limit_ms is None:
+            time_limit_ms = self._solver_option('time_limit_ms', 0)
+        solver.SetTimeLimit(int(time_limit_ms or 0))  # Pooled solvers keep the last limit
+        
+        status = solver.Solve()
         if status == pywraplp.Solver.OPTIMAL:
-            return self._prepare_results(
-                transport_vars, 
-                demands, 
-                locations
+            return status, 'optimal'
+        if status == pywraplp.Solver.FEASIBLE and self._solver_option('accept_feasible', True):
+            return status, 'feasible'
+        return status, None
+    
+    def _greedy_allocation(self, network, locations, demands, arcs) -> Dict:
+        """
+        Vectorized fallback: each (warehouse, resource) ships on its cheapest
+        feasible mode, and warehouses are drawn down cheapest-first until the
+        demand is met
+        Returns:
+            {(mode, wh_id, res): quantity} for nonzero allocations
+        """
+        resources = self.config['resource_types']
+        m, w, _, r = (np.asarray(idx, dtype=np.int64) for idx in arcs)
+        if not len(m):
+            return {}
+        
+        mode_cost = np.array([self.config['transport_modes'][mode]['cost'] for mode in network['modes']])
+        priority = np.array([self._get_priority_weight(res) for res in resources])
+        coef = mode_cost[m] - priority[r] * 0.1
+        hours = network['travel_times'][m, w, 0]
+        
+        # Cheapest (then fastest) mode per (warehouse, resource)
+        order = np.lexsort((hours, coef, w, r))
+        m, w, r, coef = m[order], w[order], r[order], coef[order]
+        first = np.ones(len(m), dtype=bool)
+        first[1:] = (w[1:] != w[:-1]) | (r[1:] != r[:-1])
+        m, w, r, coef = m[first], w[first], r[first], coef[first]
+        
+        # Per resource, cheapest warehouses first, each up to its stock
+        order = np.lexsort((coef, r))
+        m, w, r = m[order], w[order], r[order]
+        warehouses = locations['warehouses']
+        stock = np.array(
+            [warehouses[i]['inventory'].get(resources[j], 0) for i, j in zip(w.tolist(), r.tolist())],
+            dtype=np.float64
+        )
+        need = np.array([demands.get(res, 0) for res in resources], dtype=np.float64)[r]
+        
+        group_start = np.ones(len(r), dtype=bool)
+        group_start[1:] = r[1:] != r[:-1]
+        supplied_before = np.cumsum(stock) - stock
+        supplied_before -= supplied_before[np.flatnonzero(group_start)][np.cumsum(group_start) - 1]
+        quantity = np.clip(need - supplied_before, 0, stock)
+        
+        keep = np.flatnonzero(quantity > 0)
+        return {
+            (network['modes'][m[i]], network['warehouse_ids'][w[i]], resources[r[i]]): float(quantity[i])
+            for i in keep.tolist()
+        }
+    
+    def _solve_stats(self, solver, backend, status, build_start, solve_start, pruning=None) -> Dict:
+        """Per-solve timing and model size, also kept per thread in last_solve_stats"""
+        solve_end = time.perf_counter()
+        stats = {
+            'backend': backend or self.solver_pool.backend,
+            'status': STATUS_NAMES.get(status, str(status)),
+            'num_variables': solver.NumVariables(),
+            'num_constraints': solver.NumConstraints(),
+            'build_ms': round((solve_start - build_start) * 1000, 3),
+            'solve_ms': round((solve_end - solve_start) * 1000, 3)
+        }
+        if status == pywraplp.Solver.OPTIMAL:
+            stats['gap'] = 0.0
+        elif status == pywraplp.Solver.FEASIBLE:
+            objective = solver.Objective()
+            stats['gap'] = round(
+                abs(objective.Value() - objective.BestBound()) / max(abs(objective.Value()), 1e-9), 6
             )
-        else:
-            raise RuntimeError("No optimal solution found")
+        if pruning is not None:
+            stats['pruning'] = pruning
+        self._solve_local.stats = stats
+        return stats
     
-    def _add_constraints(self, vars, demands, locations):
-        """Add optimization constraints"""
+    def _add_constraints(self, solver, vars, demands, locations):
+        """
+        Add optimization constraints (response time is enforced by arc pruning)
+        Returns:
+            {'demand': {res: constraint}, 'capacity': {(wh_id, res): constraint}}
+        """
+        constraints = {'demand': {}, 'capacity': {}}
+        inflow = defaultdict(list)   # res -> vars
+        outflow = defaultdict(list)  # (wh_id, res) -> vars
+        for (mode, wh_id, res), var in vars.items():
+            inflow[res].append(var)
+            outflow[(wh_id, res)].append(var)
+        
         # 1. Demand satisfaction
         for res in self.config['resource_types']:
             if res in demands:
-                self.solver.Add(
-                    sum(
-                        vars[(mode, wh['id'], res)] 
-                        for mode in self.config['transport_modes']
-                        for wh in locations['warehouses']
-                    ) >= demands[res],
+                constraints['demand'][res] = solver.Add(
+                    solver.Sum(inflow[res]) >= demands[res],
                     f'demand_{res}'
                 )
         
         # 2. Warehouse capacity
         for wh in locations['warehouses']:
             for res in self.config['resource_types']:
-                self.solver.Add(
-                    sum(
-                        vars[(mode, wh['id'], res)] 
-                        for mode in self.config['transport_modes']
-                    ) <= wh['inventory'].get(res, 0),
-                    f'capacity_{wh["id"]}_{res}'
-                )
+                if (wh['id'], res) in outflow:
+                    constraints['capacity'][(wh['id'], res)] = solver.Add(
+                        solver.Sum(outflow[(wh['id'], res)]) <= wh['inventory'].get(res, 0),
+                        f'capacity_{wh["id"]}_{res}'
+                    )
+        return constraints
+    
+    def _network(self, warehouses: List[Dict], site_positions: List[Tuple]) -> Dict:
+        """
+        Warehouse-to-site distance and per-mode travel-time matrices, cached by
+        warehouse ids/positions and site positions
+        Returns:
+            {
+                'warehouse_ids': [...], 'warehouse_index': {id: row},
+                'modes': [...], 'mode_index': {mode: row},
+                'distances': [warehouses, sites] km,
+                'travel_times': [modes, warehouses, sites] hours
+            }
+        """
+        wh_ids = [wh['id'] for wh in warehouses]
+        wh_positions = np.asarray([wh['position'] for wh in warehouses], dtype=np.float64).reshape(-1, 2)
+        site_positions = np.asarray(site_positions, dtype=np.float64).reshape(-1, 2)
+        modes = list(self.config['transport_modes'])
+        speeds = np.array([self.config['transport_modes'][m]['speed'] for m in modes], dtype=np.float64)
         
-        # 3. Transport time limits
-        for mode, wh in [
-            (mode, wh)
-            for mode in self.config['transport_modes']
-            for wh in locations['warehouses']
-        ]:
-            distance = self._calculate_distance(
-                wh['position'],
-                locations['disaster_site']
-            )
-            transport_time = distance / self.config['transport_modes'][mode]['speed']
-            self.solver.Add(
-                transport_time <= self.config['max_response_time'],
-                f'time_{mode}_{wh["id"]}'
-            )
+        digest = hashlib.sha1()
+        digest.update(json.dumps([wh_ids, modes]).encode('utf-8'))
+        digest.update(wh_positions.tobytes())
+        digest.update(site_positions.tobytes())
+        digest.update(speeds.tobytes())
+        key = digest.hexdigest()
+        
+        with self._network_lock:
+            if key in self._network_cache:
+                self._network_cache.move_to_end(key)
+                return self._network_cache[key]
+        
+        distances = self._haversine_matrix(wh_positions, site_positions)
+        network = {
+            'warehouse_ids': wh_ids,
+            'warehouse_index': {wh_id: i for i, wh_id in enumerate(wh_ids)},
+            'modes': modes,
+            'mode_index': {mode: i for i, mode in enumerate(modes)},
+            'distances': distances,
+            'travel_times': distances[None, :, :] / speeds[:, None, None]
+        }
+        
+        with self._network_lock:
+            self._network_cache[key] = network
+            while len(self._network_cache) > self.config.get('network_cache_size', 32):
+                self._network_cache.popitem(last=False)
+        return network
+    
+    def _travel_time(self, network, mode, wh_id, site: int = 0) -> float:
+        """O(1) travel-time lookup in hours"""
+        return float(network['travel_times'][
+            network['mode_index'][mode], network['warehouse_index'][wh_id], site
+        ])
+    
+    def _haversine_matrix(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """Vectorized haversine distances in km, shape [origins, destinations]"""
+        radius = 6371  # Earth radius in km
+        lat1 = np.radians(origins[:, 0])[:, None]
+        lon1 = np.radians(origins[:, 1])[:, None]
+        lat2 = np.radians(destinations[:, 0])[None, :]
+        lon2 = np.radians(destinations[:, 1])[None, :]
+        
+        a = (np.sin((lat2 - lat1) / 2) ** 2 +
+             np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+        return radius * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
     
     def _calculate_distance(self, pos1, pos2):
         """Haversine distance calculation"""
@@ -154,8 +1013,57 @@ class ResourceAllocator:
             return self.config['priority_weights']['essential']
         return self.config['priority_weights']['standard']
     
-    def _prepare_results(self, vars, demands, locations):
-        """Format optimization results"""
+    def _plan_id(self, timestamp: str, demands: Dict) -> str:
+        """Deterministic plan id from its timestamp and the demands it serves"""
+        payload = json.dumps([timestamp, demands], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+    
+    def _columnar_results(self, arcs, values, demands, network):
+        """
+        Format optimization results as columns
+        Args:
+            arcs: Arc index lists from _prune_arcs(), aligned with values
+            values: Solution quantity per arc
+        Returns:
+            Same summary fields as _prepare_results(), with 'allocations' as a DataFrame
+        """
+        resources = self.config['resource_types']
+        m, w, _, r = (np.asarray(idx, dtype=np.int64) for idx in arcs)
+        nonzero = np.flatnonzero(values > 0)
+        m, w, r, quantity = m[nonzero], w[nonzero], r[nonzero], values[nonzero]
+        
+        mode_cost = np.array([self.config['transport_modes'][mode]['cost'] for mode in network['modes']])
+        priority = np.array([self._get_priority_weight(res) for res in resources])
+        hours = network['travel_times'][m, w, 0]
+        cost = quantity * mode_cost[m]
+        
+        allocations = pd.DataFrame({
+            'resource': np.asarray(resources, dtype=object)[r],
+            'source': np.asarray(network['warehouse_ids'], dtype=object)[w],
+            'destination': 'disaster_site',
+            'transport_mode': np.asarray(network['modes'], dtype=object)[m],
+            'quantity': quantity,
+            'cost': cost,
+            'estimated_hours': np.round(hours, 2),
+            'priority': priority[r]
+        })
+        
+        timestamp = datetime.now().isoformat()
+        return {
+            'plan_id': self._plan_id(timestamp, demands),
+            'allocations': allocations,
+            'total_cost': float(cost.sum()),
+            'max_arrival_time': float(hours.max()) if len(hours) else 0,
+            'fulfillment_percentage': round(float(quantity.sum()) / sum(demands.values()) * 100, 2),
+            'timestamp': timestamp
+        }
+    
+    def _prepare_results(self, values, demands, network):
+        """
+        Format optimization results
+        Args:
+            values: {(mode, wh_id, res): quantity} from the solver or the greedy fallback
+        """
         plan = {
             'allocations': [],
             'total_cost': 0,
@@ -164,23 +1072,18 @@ class ResourceAllocator:
         }
         
         # Extract variable values
-        for var_key, var in vars.items():
-            if var.solution_value() > 0:
+        for var_key, quantity in values.items():
+            if quantity > 0:
                 mode, wh_id, res = var_key
-                wh = next(w for w in locations['warehouses'] if w['id'] == wh_id)
-                distance = self._calculate_distance(
-                    wh['position'],
-                    locations['disaster_site']
-                )
-                time = distance / self.config['transport_modes'][mode]['speed']
+                time = self._travel_time(network, mode, wh_id)
                 
                 allocation = {
                     'resource': res,
                     'source': wh_id,
                     'destination': 'disaster_site',
                     'transport_mode': mode,
-                    'quantity': var.solution_value(),
-                    'cost': var.solution_value() * self.config['transport_modes'][mode]['cost'],
+                    'quantity': quantity,
+                    'cost': quantity * self.config['transport_modes'][mode]['cost'],
                     'estimated_hours': round(time, 2),
                     'priority': self._get_priority_weight(res)
                 }
@@ -189,6 +1092,7 @@ class ResourceAllocator:
                 plan['estimated_arrival_times'].append(time)
         
         # Calculate metrics
+        plan['plan_id'] = self._plan_id(plan['timestamp'], demands)
         plan['max_arrival_time'] = max(plan['estimated_arrival_times']) if plan['estimated_arrival_times'] else 0
         plan['fulfillment_percentage'] = round(
             sum(a['quantity'] for a in plan['allocations']) / 
@@ -197,32 +1101,104 @@ class ResourceAllocator:
         
         return plan
     
+    def _prepare_multi_site_results(self, vars, shortfall_vars, sites, network):
+        """Format multi-site optimization results"""
+        site_index = {site['id']: i for i, site in enumerate(sites)}
+        plan = {
+            'allocations': [],
+            'sites': {},
+            'total_cost': 0,
+            'timestamp': datetime.now().isoformat()
+        }
+        delivered = defaultdict(float)
+        arrival = defaultdict(float)
+        
+        for (mode, wh_id, site_id, res), var in vars.items():
+            quantity = var.solution_value()
+            if quantity > 0:
+                time = self._travel_time(network, mode, wh_id, site_index[site_id])
+                allocation = {
+                    'resource': res,
+                    'source': wh_id,
+                    'destination': site_id,
+                    'transport_mode': mode,
+                    'quantity': quantity,
+                    'cost': quantity * self.config['transport_modes'][mode]['cost'],
+                    'estimated_hours': round(time, 2),
+                    'priority': self._get_priority_weight(res)
+                }
+                plan['allocations'].append(allocation)
+                plan['total_cost'] += allocation['cost']
+                delivered[site_id] += quantity
+                arrival[site_id] = max(arrival[site_id], time)
+        
+        for site in sites:
+            shortfall = {
+                res: shortfall_vars[(site['id'], res)].solution_value()
+                for res in self.config['resource_types']
+                if (site['id'], res) in shortfall_vars
+            }
+            total_demand = sum(
+                site['demands'].get(res, 0) for res in self.config['resource_types']
+            )
+            plan['sites'][site['id']] = {
+                'max_arrival_time': arrival[site['id']],
+                'fulfillment_percentage': round(
+                    delivered[site['id']] / total_demand * 100, 2
+                ) if total_demand else 100.0,
+                'shortfall': {res: amount for res, amount in shortfall.items() if amount > 0}
+            }
+        
+        plan['plan_id'] = self._plan_id(plan['timestamp'], {site['id']: site['demands'] for site in sites})
+        plan['max_arrival_time'] = max(arrival.values()) if arrival else 0
+        total_demand = sum(
+            site['demands'].get(res, 0) for site in sites for res in self.config['resource_types']
+        )
+        plan['fulfillment_percentage'] = round(
+            sum(delivered.values()) / total_demand * 100, 2
+        ) if total_demand else 100.0
+        
+        return plan
+    
     def generate_blockchain_records(self, allocation_plan):
         """
         Prepare allocation records for Hyperledger Fabric
         Args:
-            allocation_plan: Output from optimize_transport()
+            allocation_plan: Output from optimize_transport() or optimize_multi_site(),
+                with 'allocations' as a list of dicts or a DataFrame (columnar=True)
         Returns:
-            List of blockchain transactions
+            List of blockchain transactions; asset ids are derived from the plan id
+            and the arc, so regenerating records for a plan yields the same ids
         """
-        transactions = []
-        for alloc in allocation_plan['allocations']:
-            tx = {
-                'asset_id': f"{alloc['resource']}_{alloc['source']}_{datetime.now().timestamp()}",
-                'resource_type': alloc['resource'],
-                'quantity': alloc['quantity'],
-                'from': alloc['source'],
-                'to': alloc['destination'],
-                'transport': alloc['transport_mode'],
-                'timestamp': allocation_plan['timestamp'],
+        fields = ['resource', 'quantity', 'source', 'destination', 'transport_mode',
+                  'cost', 'estimated_hours', 'priority']
+        allocations = allocation_plan['allocations']
+        if isinstance(allocations, pd.DataFrame):
+            rows = zip(*(allocations[field].tolist() for field in fields))
+        else:
+            rows = (tuple(alloc[field] for field in fields) for alloc in allocations)
+        
+        timestamp = allocation_plan['timestamp']
+        plan_id = allocation_plan.get('plan_id') or self._plan_id(timestamp, {})
+        return [
+            {
+                'asset_id': f"{res}_{src}_" + hashlib.sha1(
+                    f'{plan_id}|{mode}|{src}|{dst}|{res}'.encode('utf-8')
+                ).hexdigest()[:16],
+                'resource_type': res,
+                'quantity': quantity,
+                'from': src,
+                'to': dst,
+                'transport': mode,
+                'timestamp': timestamp,
                 'metadata': {
-                    'cost': alloc['cost'],
-                    'estimated_hours': alloc['estimated_hours'],
-                    'priority': alloc['priority']
+                    'cost': cost,
+                    'estimated_hours': hours,
+                    'priority': priority
                 }
             }
-            transactions.append(tx)
-        return transactions
+            for res, quantity, src, dst, mode, cost, hours, priority in rows
+        ]
     
     def save_config(self, filepath):
         """Save configuration to JSON"""
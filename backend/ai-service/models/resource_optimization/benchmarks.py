@@ -0,0 +1,206 @@
+# ai-service/models/resource_optimization/benchmarks.py
+import json
+import os
+import pickle
+import time
+import tracemalloc
+import joblib
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from typing import Callable, Dict, List, Optional, Sequence
+from models.resource_optimization.predictive_model import ResourcePredictor
+from models.resource_optimization.compiled_forest import CompiledForest
+from models.resource_optimization.allocation_model import ResourceAllocator
+
+def _latency_stats(samples) -> Dict:
+    """Summarize wall-clock samples (seconds) in milliseconds"""
+    ms = np.asarray(samples) * 1000
+    return {
+        'mean_ms': round(float(ms.mean()), 3),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3)
+    }
+
+def _model_nbytes(predictor: ResourcePredictor) -> int:
+    """Approximate in-memory size of a predictor's models"""
+    total = 0
+    for name, model in predictor.models.items():
+        if 'lstm' in name:
+            total += model.count_params() * 4  # float32 weights
+        else:
+            total += len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+    return total
+
+def benchmark_prediction_layouts(historical_data: pd.DataFrame,
+                                 current_conditions: Dict,
+                                 config: Optional[Dict] = None,
+                                 n_runs: int = 50) -> Dict:
+    """
+    Compare per-request latency and memory of the per-resource model layout
+    (one forest + one LSTM per resource) against the multi-output layout
+    Args:
+        historical_data: Training data for both layouts
+        current_conditions: Conditions passed to predict()
+        config: Base ResourcePredictor config (defaults to the built-in one)
+        n_runs: Timed predict() calls per layout
+    Returns:
+        {layout: {latency stats, model_bytes, peak_predict_bytes}, 'speedup': float}
+    """
+    base_config = config or ResourcePredictor().config
+    results = {}
+
+    for layout, multi_output in [('per_resource', False), ('multi_output', True)]:
+        predictor = ResourcePredictor({**base_config, 'multi_output': multi_output})
+        predictor.train(historical_data)
+        predictor.predict(current_conditions)  # Warm-up
+
+        timings = []
+        for _ in range(n_runs):
+            start = time.perf_counter()
+            predictor.predict(current_conditions)
+            timings.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        predictor.predict(current_conditions)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[layout] = {
+            **_latency_stats(timings),
+            'model_bytes': _model_nbytes(predictor),
+            'peak_predict_bytes': peak
+        }
+
+    results['speedup'] = round(
+        results['per_resource']['mean_ms'] / results['multi_output']['mean_ms'], 2
+    )
+    return results
+
+def benchmark_load_time(predictor: ResourcePredictor, directory: str, n_runs: int = 5) -> Dict:
+    """
+    Compare load time of the legacy per-file layout (save_models) against the
+    packaged bundle (save_bundle), with and without memory-mapped forests
+    Args:
+        predictor: Trained ResourcePredictor to save in both formats
+        directory: Scratch directory for the artifacts
+        n_runs: Timed loads per format
+    Returns:
+        {format: latency stats, plus 'size_bytes' on disk}
+    """
+    legacy_dir = os.path.join(directory, 'legacy')
+    bundle_dir = os.path.join(directory, 'bundle')
+    os.makedirs(legacy_dir, exist_ok=True)
+    predictor.save_models(legacy_dir)
+    predictor.save_bundle(bundle_dir)
+
+    loaders = {
+        'legacy': lambda: _load_legacy(legacy_dir),
+        'bundle': lambda: ResourcePredictor.load_bundle(bundle_dir, mmap=False),
+        'bundle_mmap': lambda: ResourcePredictor.load_bundle(bundle_dir, mmap=True)
+    }
+    sizes = {'legacy': _dir_size(legacy_dir), 'bundle': _dir_size(bundle_dir)}
+
+    results = {}
+    for fmt, load in loaders.items():
+        timings = []
+        for _ in range(n_runs):
+            start = time.perf_counter()
+            load()
+            timings.append(time.perf_counter() - start)
+        results[fmt] = {**_latency_stats(timings), 'size_bytes': sizes[fmt.split('_')[0]]}
+    return results
+
+def _load_legacy(directory: str) -> ResourcePredictor:
+    """Reproduce the original loader: build every model, then overwrite it"""
+    with open(os.path.join(directory, 'config.json'), 'r') as f:
+        instance = ResourcePredictor(json.load(f))
+    for name in instance.models:
+        if 'lstm' in name:
+            instance.models[name] = tf.keras.models.load_model(os.path.join(directory, f'{name}.h5'))
+        else:
+            instance.models[name] = joblib.load(os.path.join(directory, f'{name}.joblib'))
+    return instance
+
+def _dir_size(directory: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(directory)
+        for name in files
+    )
+
+def benchmark_forest_backends(predictor: ResourcePredictor,
+                              current_conditions: Dict,
+                              n_runs: int = 200) -> Dict:
+    """
+    Compare sklearn and compiled (ONNX) forest inference on single requests
+    Args:
+        predictor: Trained ResourcePredictor
+        current_conditions: Conditions used to build the request input
+        n_runs: Timed calls per backend
+    Returns:
+        {backend: latency stats, 'max_abs_diff': parity between backends}
+    """
+    X = predictor._prepare_prediction_input(current_conditions, predictor.config['time_horizon'])
+    compiled = {
+        name: CompiledForest(model, X.shape[1])
+        for name, model in predictor.models.items()
+        if 'lstm' not in name
+    }
+
+    backends = {
+        'sklearn': lambda: [predictor.models[name].predict(X) for name in compiled],
+        'onnx': lambda: [forest.predict(X) for forest in compiled.values()]
+    }
+    results = {}
+    outputs = {}
+    for backend, run in backends.items():
+        outputs[backend] = run()  # Warm-up
+        timings = []
+        for _ in range(n_runs):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        results[backend] = _latency_stats(timings)
+
+    results['max_abs_diff'] = float(max(
+        np.max(np.abs(np.asarray(a) - np.asarray(b)))
+        for a, b in zip(outputs['sklearn'], outputs['onnx'])
+    ))
+    results['speedup'] = round(results['sklearn']['mean_ms'] / results['onnx']['mean_ms'], 2)
+    return results
+
+def benchmark_two_stage(allocator: ResourceAllocator,
+                        warehouses: List[Dict],
+                        hubs: List[Dict],
+                        sites: List[Dict],
+                        sample_scenarios: Callable,
+                        scenario_counts: Sequence[int] = (10, 50, 100, 200),
+                        seed: int = 0) -> Dict:
+    """
+    Solve time of the decomposed two-stage model against the number of scenarios
+    Args:
+        allocator: ResourceAllocator to solve with
+        warehouses, hubs, sites: As in ResourceAllocator.optimize_two_stage()
+        sample_scenarios: Callable (rng, n) -> n scenarios
+        scenario_counts: Scenario counts to time
+        seed: Random seed for the scenario samples
+    Returns:
+        {n_scenarios: {'solve_ms', 'ms_per_scenario', 'iterations', 'cuts', 'gap'}}
+    """
+    rng = np.random.default_rng(seed)
+    results = {}
+    for n in scenario_counts:
+        scenarios = sample_scenarios(rng, n)
+        start = time.perf_counter()
+        plan = allocator.optimize_two_stage(warehouses, hubs, sites, scenarios)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        stats = plan['solver_stats']
+        results[n] = {
+            'solve_ms': round(elapsed_ms, 3),
+            'ms_per_scenario': round(elapsed_ms / n, 3),
+            'iterations': stats['iterations'],
+            'cuts': stats['cuts'],
+            'gap': stats['gap']
+        }
+    return results
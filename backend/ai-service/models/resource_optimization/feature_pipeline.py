@@ -0,0 +1,161 @@
+# ai-service/models/resource_optimization/feature_pipeline.py
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+class FeaturePipeline:
+    def __init__(self, config=None):
+        """
+        Fitted feature engineering for ResourcePredictor: categorical vocabularies
+        and z-score parameters learned once and reused at inference time
+
+        Args:
+            config (dict): Configuration parameters
+        """
+        self.config = config or {
+            'feature_columns': [
+                'disaster_type',
+                'severity',
+                'population_density',
+                'affected_area',
+                'weather_conditions',
+                'time_since_disaster'
+            ],
+            'categorical_columns': ['disaster_type', 'weather_conditions']
+        }
+        self.vocabularies = {}
+        self.scalers = {}
+
+    @property
+    def is_fitted(self) -> bool:
+        return bool(self.vocabularies or self.scalers)
+
+    @property
+    def feature_names(self) -> List[str]:
+        """Model input columns, in a stable order"""
+        names = []
+        for col in self.config['feature_columns']:
+            if col in self.config['categorical_columns']:
+                names.extend(f'{col}_{value}' for value in self.vocabularies.get(col, []))
+            else:
+                names.append(col)
+        return names
+
+    def fit(self, data: pd.DataFrame):
+        """
+        Learn vocabularies and scaler parameters
+        Args:
+            data: Raw DataFrame containing feature_columns
+        """
+        self.vocabularies = {
+            col: sorted(data[col].dropna().astype(str).unique().tolist())
+            for col in self.config['categorical_columns']
+            if col in data.columns
+        }
+        self.scalers = {}
+        for col in self.config['feature_columns']:
+            if col in self.config['categorical_columns'] or col not in data.columns:
+                continue
+            std = float(data[col].std())
+            self.scalers[col] = {
+                'mean': float(data[col].mean()),
+                'std': std if std and not np.isnan(std) else 1.0
+            }
+        return self
+
+    def transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Encode raw features into the model input matrix
+        Args:
+            data: Raw DataFrame containing feature_columns
+        Returns:
+            float32 DataFrame with columns feature_names; categories unseen
+            during fit encode as all zeros
+        """
+        columns = {}
+        for col in self.config['feature_columns']:
+            if col in self.config['categorical_columns']:
+                vocab = self.vocabularies.get(col, [])
+                codes = pd.Categorical(data[col].astype(str), categories=vocab).codes
+                one_hot = np.zeros((len(data), len(vocab)), dtype=np.float32)
+                known = codes >= 0
+                one_hot[np.flatnonzero(known), codes[known]] = 1.0
+                for i, value in enumerate(vocab):
+                    columns[f'{col}_{value}'] = one_hot[:, i]
+            else:
+                scaler = self.scalers.get(col, {'mean': 0.0, 'std': 1.0})
+                values = data[col].to_numpy(dtype=np.float32)
+                columns[col] = (values - scaler['mean']) / scaler['std']
+
+        return pd.DataFrame(columns, index=data.index, columns=self.feature_names)
+
+    def fit_transform(self, data: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(data).transform(data)
+
+    def to_dict(self) -> Dict:
+        return {
+            'config': self.config,
+            'vocabularies': self.vocabularies,
+            'scalers': self.scalers
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict):
+        instance = cls(state['config'])
+        instance.vocabularies = state['vocabularies']
+        instance.scalers = state['scalers']
+        return instance
+
+    def save(self, filepath: str):
+        """Save fitted parameters to JSON"""
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, filepath: str):
+        """Load fitted parameters from JSON"""
+        with open(filepath, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+
+class FeatureCache:
+    def __init__(self, directory: str):
+        """
+        On-disk Parquet cache of engineered features keyed by a hash of the raw
+        data snapshot and the pipeline configuration
+
+        Args:
+            directory: Cache directory
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, data: pd.DataFrame, pipeline_config: Dict) -> str:
+        """Content hash of the raw snapshot plus pipeline configuration"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(pipeline_config, sort_keys=True).encode('utf-8'))
+        digest.update(json.dumps([str(c) for c in data.columns]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+        return digest.hexdigest()[:32]
+
+    def load(self, key: str) -> Optional[Tuple[pd.DataFrame, FeaturePipeline]]:
+        """Return (features, fitted pipeline) for a key, or None on a miss"""
+        features_path, pipeline_path = self._paths(key)
+        if not (os.path.exists(features_path) and os.path.exists(pipeline_path)):
+            return None
+        return pd.read_parquet(features_path), FeaturePipeline.load(pipeline_path)
+
+    def save(self, key: str, features: pd.DataFrame, pipeline: FeaturePipeline):
+        """Store engineered features and the pipeline that produced them"""
+        features_path, pipeline_path = self._paths(key)
+        features.to_parquet(features_path)
+        pipeline.save(pipeline_path)
+
+    def _paths(self, key: str):
+        return (
+            os.path.join(self.directory, f'{key}.parquet'),
+            os.path.join(self.directory, f'{key}.json')
+        )
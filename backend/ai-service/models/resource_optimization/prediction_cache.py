@@ -0,0 +1,81 @@
+# ai-service/models/resource_optimization/prediction_cache.py
+import copy
+import json
+import threading
+from cachetools import TTLCache
+from typing import Any, Dict, Optional, Tuple
+
+class PredictionCache:
+    def __init__(self, config=None):
+        """
+        LRU + TTL memoization of ResourcePredictor outputs keyed on
+        canonicalized (optionally quantized) disaster conditions
+
+        Args:
+            config (dict): Configuration parameters
+        """
+        self.config = config or {
+            'max_size': 1024,
+            'ttl': 300,          # Seconds before an entry expires
+            'quantization': {}   # {feature: step}, e.g. {'population_density': 100}
+        }
+        self._cache = TTLCache(maxsize=self.config['max_size'], ttl=self.config['ttl'])
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.generation = 0  # Bumped by clear(); results computed before it are dropped
+
+    def canonicalize(self, conditions: Dict, days_ahead: int) -> Tuple[Dict, str]:
+        """
+        Snap quantized features to their grid and build a stable key
+        Args:
+            conditions: Raw condition features
+            days_ahead: Prediction horizon
+        Returns:
+            (conditions to predict on, cache key)
+        """
+        canonical = {}
+        for name, value in conditions.items():
+            step = self.config['quantization'].get(name)
+            if step and isinstance(value, (int, float)) and not isinstance(value, bool):
+                value = round(round(value / step) * step, 10)
+            canonical[name] = value
+
+        key = json.dumps([days_ahead, sorted(canonical.items())], default=str)
+        return canonical, key
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            result = self._cache.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return copy.deepcopy(result)
+
+    def put(self, key: str, result: Dict, generation: int = None):
+        """
+        Store a result; if generation (read before computing it) is older than
+        the last clear(), the result came from replaced models and is dropped
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._cache[key] = copy.deepcopy(result)
+
+    def clear(self):
+        """Drop all entries (e.g. after models are retrained or reloaded)"""
+        with self._lock:
+            self._cache.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'size': len(self._cache),
+            'max_size': self.config['max_size'],
+            'ttl': self.config['ttl']
+        }
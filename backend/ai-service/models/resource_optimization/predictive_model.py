@@ -1,24 +1,49 @@
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import joblib
+from joblib import Parallel, delayed
 from typing import Dict, List, Union
+import copy
 import json
+import logging
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Dense, LSTM
 from tensorflow.keras.optimizers import Adam
+from models.resource_optimization.feature_pipeline import FeaturePipeline, FeatureCache
+from models.resource_optimization.compiled_forest import CompiledForest
+from models.resource_optimization.prediction_cache import PredictionCache
+
+def _fit_forest(model, X, y, n_jobs):
+    """Fit a forest with n_jobs threads (module-level so process pools can pickle it)"""
+    model.set_params(n_jobs=n_jobs)
+    model.fit(X, y)
+    # Single-row inference is fastest without a thread pool
+    model.set_params(n_jobs=None)
+    return model
 
 class ResourcePredictor:
-    def __init__(self, config=None):
+    # Version of the save_bundle() artifact layout
+    BUNDLE_FORMAT_VERSION = 2
+    
+    def __init__(self, config=None, initialize_models=True):
         """
         Hybrid ML model for predicting disaster resource requirements
         
         Args:
             config (dict): Configuration parameters
+            initialize_models (bool): Build fresh models; loaders pass False
+                and fill self.models from disk instead
         """
         self.config = config or {
             'model_type': 'hybrid',  # 'rf' (Random Forest) or 'lstm' or 'hybrid'
@@ -39,36 +64,103 @@ class ResourcePredictor:
                 'time_since_disaster'
             ],
             'lstm_units': 64,
-            'rf_n_estimators': 100
+            'rf_n_estimators': 100,
+            'multi_output': False,  # One multi-target forest + one 5-wide LSTM instead of one per resource
+            'sequence_chunk_size': None,  # Stream LSTM windows in chunks of this many (bounded memory)
+            'categorical_columns': ['disaster_type', 'weather_conditions'],
+            'feature_cache_dir': None,  # Parquet cache of engineered features keyed by snapshot hash
+            'parallel_training': True,  # Forests in a process pool, LSTMs fitted together
+            'n_jobs': -1,  # Cores available to training (-1 = all)
+            'train_verbose': 1,
+            'rf_backend': 'sklearn',  # 'onnx' compiles fitted forests (falls back to sklearn)
+            'incremental': {  # update(): grow/replace trees and fine-tune LSTMs on new data
+                'new_trees': 10,     # Trees added per update
+                'max_trees': 200,    # Oldest trees are dropped beyond this
+                'lstm_epochs': 2,
+                'interval': 600      # Seconds between background updates
+            },
+            'prediction_intervals': [10, 50, 90],  # Percentiles over forest trees for intervals=True
+            'prediction_cache': {  # None disables memoization of predict()
+                'max_size': 1024,
+                'ttl': 300,
+                'quantization': {}  # {feature: step}, e.g. {'population_density': 100}
+            }
         }
-        self.models = self._initialize_models()
-        self.scalers = {}
+        self.feature_pipeline = FeaturePipeline({
+            'feature_columns': self.config['feature_columns'],
+            'categorical_columns': self.config.get(
+                'categorical_columns', ['disaster_type', 'weather_conditions']
+            )
+        })
+        self.models = self._initialize_models() if initialize_models else {}
+        self.scalers = self.feature_pipeline.scalers
         self.feature_importances = {}
+        self.training_times = {}
+        self.compiled_forests = {}
+        self._leaf_tables = {}
+        # Held while models are evaluated or swapped by an incremental update
+        self._model_lock = threading.RLock()
+        self._update_stop = threading.Event()
+        self._update_thread = None
+        self._update_count = 0
+        self.logger = logging.getLogger('resource_predictor')
+        self.prediction_cache = (
+            PredictionCache(self.config['prediction_cache'])
+            if self.config.get('prediction_cache') else None
+        )
         
     def _initialize_models(self):
         """Initialize model architecture based on config"""
         models = {}
+        multi_output = self.config.get('multi_output', False)
         
         if self.config['model_type'] in ['rf', 'hybrid']:
-            for res_type in self.config['resource_types']:
-                models[f'{res_type}_rf'] = RandomForestRegressor(
+            if multi_output:
+                # RandomForestRegressor handles multi-target y natively
+                models['multi_rf'] = RandomForestRegressor(
                     n_estimators=self.config['rf_n_estimators'],
                     random_state=42
                 )
+            else:
+                for res_type in self.config['resource_types']:
+                    models[f'{res_type}_rf'] = RandomForestRegressor(
+                        n_estimators=self.config['rf_n_estimators'],
+                        random_state=42
+                    )
         
         if self.config['model_type'] in ['lstm', 'hybrid']:
-            for res_type in self.config['resource_types']:
-                models[f'{res_type}_lstm'] = self._build_lstm_model()
+            if multi_output:
+                models['multi_lstm'] = self._build_lstm_model(outputs=len(self.config['resource_types']))
+            else:
+                for res_type in self.config['resource_types']:
+                    models[f'{res_type}_lstm'] = self._build_lstm_model()
                 
         return models
     
-    def _build_lstm_model(self):
+    def _model_names(self) -> List[str]:
+        """Names of the models this config uses, without building them"""
+        if self.config.get('multi_output', False):
+            names = {'rf': ['multi_rf'], 'lstm': ['multi_lstm']}
+        else:
+            names = {
+                kind: [f'{res_type}_{kind}' for res_type in self.config['resource_types']]
+                for kind in ['rf', 'lstm']
+            }
+        
+        selected = []
+        if self.config['model_type'] in ['rf', 'hybrid']:
+            selected.extend(names['rf'])
+        if self.config['model_type'] in ['lstm', 'hybrid']:
+            selected.extend(names['lstm'])
+        return selected
+    
+    def _build_lstm_model(self, outputs=1):
         """Build LSTM model for time-series resource prediction"""
         model = Sequential([
             LSTM(self.config['lstm_units'], 
-                input_shape=(self.config['time_horizon'], len(self.config['feature_columns']))),
+                input_shape=(self.config['time_horizon'], len(self._model_features()))),
             Dense(32, activation='relu'),
-            Dense(1)
+            Dense(outputs)
         ])
         model.compile(
             optimizer=Adam(learning_rate=0.001),
@@ -77,6 +169,12 @@ class ResourcePredictor:
         )
         return model
     
+    def _model_features(self) -> List[str]:
+        """Encoded model input columns (raw feature_columns until the pipeline is fitted)"""
+        if self.feature_pipeline.is_fitted:
+            return self.feature_pipeline.feature_names
+        return self.config['feature_columns']
+    
     def preprocess_data(self, historical_data: pd.DataFrame):
         """
         Prepare data for training
@@ -85,20 +183,14 @@ class ResourcePredictor:
         Returns:
             Processed features and targets
         """
-        # Convert categorical features
-        data = pd.get_dummies(historical_data, columns=['disaster_type', 'weather_conditions'])
-        
-        # Normalize numerical features
-        for col in ['severity', 'population_density', 'affected_area', 'time_since_disaster']:
-            if col in data.columns:
-                data[col] = (data[col] - data[col].mean()) / data[col].std()
+        data = self._engineer_features(historical_data)
         
         # Create time-series sequences for LSTM
         if self.config['model_type'] in ['lstm', 'hybrid']:
             X_seq, y_seq = self._create_sequences(data)
         
         # Prepare tabular data for Random Forest
-        X_rf = data[self.config['feature_columns']]
+        X_rf = data[self._model_features()]
         y_rf = data[self.config['resource_types']]
         
         return {
@@ -108,22 +200,141 @@ class ResourcePredictor:
             'y_seq': y_seq if 'y_seq' in locals() else None
         }
     
+    def _engineer_features(self, historical_data: pd.DataFrame) -> pd.DataFrame:
+        """Fit the feature pipeline and encode, or reuse cached features for this snapshot"""
+        cache = cache_key = None
+        if self.config.get('feature_cache_dir'):
+            cache = FeatureCache(self.config['feature_cache_dir'])
+            cache_key = cache.key(historical_data, self.feature_pipeline.config)
+            cached = cache.load(cache_key)
+            if cached is not None:
+                data, self.feature_pipeline = cached
+                self.scalers = self.feature_pipeline.scalers
+                return data
+        
+        features = self.feature_pipeline.fit_transform(historical_data)
+        self.scalers = self.feature_pipeline.scalers
+        data = pd.concat([features, historical_data[self.config['resource_types']]], axis=1)
+        
+        if cache is not None:
+            cache.save(cache_key, data, self.feature_pipeline)
+        return data
+    
     def _create_sequences(self, data):
-        """Create time-series sequences for LSTM"""
-        X, y = [], []
-        for i in range(len(data) - self.config['time_horizon']):
-            X.append(data.iloc[i:i+self.config['time_horizon']][self.config['feature_columns']].values)
-            y.append(data.iloc[i+self.config['time_horizon']][self.config['resource_types']].values)
-        return np.array(X), np.array(y)
+        """
+        Create time-series sequences for LSTM
+        
+        Window i covers rows [i, i + time_horizon) and its target is row
+        i + time_horizon. X is a read-only strided view over one contiguous
+        float32 feature matrix, so no per-window copies are made.
+        """
+        horizon = self.config['time_horizon']
+        features = np.ascontiguousarray(
+            data[self._model_features()].to_numpy(dtype=np.float32)
+        )
+        targets = data[self.config['resource_types']].to_numpy(dtype=np.float32)
+        
+        if len(data) <= horizon:
+            return (
+                np.empty((0, horizon, features.shape[1]), dtype=np.float32),
+                np.empty((0, targets.shape[1]), dtype=np.float32)
+            )
+        
+        X = sliding_window_view(features[:-1], horizon, axis=0).transpose(0, 2, 1)
+        return X, targets[horizon:]
+    
+    def _sequence_dataset(self, X_seq, y_seq, chunk_size):
+        """Stream windows to Keras in contiguous chunks so at most one chunk is copied at a time"""
+        def chunks():
+            for start in range(0, len(X_seq), chunk_size):
+                yield (
+                    np.ascontiguousarray(X_seq[start:start + chunk_size]),
+                    np.asarray(y_seq[start:start + chunk_size], dtype=np.float32)
+                )
+        
+        return tf.data.Dataset.from_generator(
+            chunks,
+            output_signature=(
+                tf.TensorSpec(shape=(None,) + X_seq.shape[1:], dtype=tf.float32),
+                tf.TensorSpec(shape=(None,) + y_seq.shape[1:], dtype=tf.float32)
+            )
+        ).unbatch().shuffle(chunk_size).batch(32).prefetch(tf.data.AUTOTUNE)
+    
+    def _fit_lstm(self, model, X_seq, y_seq):
+        """Fit an LSTM in memory, or chunk by chunk when sequence_chunk_size is set"""
+        chunk_size = self.config.get('sequence_chunk_size')
+        if not chunk_size:
+            X_train, X_test, y_train, y_test = train_test_split(
+                X_seq,
+                y_seq,
+                test_size=0.2
+            )
+            return model.fit(
+                X_train, y_train,
+                validation_data=(X_test, y_test),
+                epochs=50,
+                batch_size=32,
+                verbose=self.config.get('train_verbose', 1)
+            )
+        
+        # Hold out the most recent 20% of windows instead of a random split,
+        # which would copy every window
+        split = int(len(X_seq) * 0.8)
+        return model.fit(
+            self._sequence_dataset(X_seq[:split], y_seq[:split], chunk_size),
+            validation_data=self._sequence_dataset(X_seq[split:], y_seq[split:], chunk_size),
+            epochs=50,
+            verbose=self.config.get('train_verbose', 1)
+        )
     
     def train(self, historical_data: pd.DataFrame):
         """
         Train the predictive models
         Args:
             historical_data: DataFrame containing historical disaster records
+        Returns:
+            Per-stage wall-clock breakdown in seconds (also kept in self.training_times)
         """
-        processed = self.preprocess_data(historical_data)
+        self.training_times = {}
+        
+        with self._timed('preprocess'):
+            processed = self.preprocess_data(historical_data)
+        
+        # LSTM input width depends on the fitted categorical vocabularies
+        n_features = len(self._model_features())
+        for name, model in self.models.items():
+            if 'lstm' in name and model.input_shape[-1] != n_features:
+                self.models[name] = self._build_lstm_model(outputs=model.output_shape[-1])
+        
+        if self.config.get('multi_output', False):
+            self._train_multi_output(processed)
+        elif self.config.get('parallel_training', False):
+            self._train_parallel(processed)
+        else:
+            self._train_sequential(processed)
+        
+        with self._timed('finalize'):
+            self._models_changed(processed['X_rf'].iloc[:256])
         
+        self.training_times['total'] = round(sum(self.training_times.values()), 3)
+        print("Training stage times (s): " + ", ".join(
+            f"{stage}={seconds:.2f}" for stage, seconds in self.training_times.items()
+        ))
+        return self.training_times
+    
+    @contextmanager
+    def _timed(self, stage: str):
+        """Record the wall-clock time of a training stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.training_times[stage] = round(
+                self.training_times.get(stage, 0) + time.perf_counter() - start, 3
+            )
+    
+    def _train_sequential(self, processed):
+        """Train one forest and one LSTM per resource, one after another"""
         # Train Random Forest models
         if self.config['model_type'] in ['rf', 'hybrid']:
             for i, res_type in enumerate(self.config['resource_types']):
@@ -132,76 +343,475 @@ class ResourcePredictor:
                     processed['y_rf'][res_type],
                     test_size=0.2
                 )
-                self.models[f'{res_type}_rf'].fit(X_train, y_train)
+                with self._timed('rf_fit'):
+                    self.models[f'{res_type}_rf'].fit(X_train, y_train)
                 
                 # Store feature importances
                 self.feature_importances[res_type] = dict(zip(
-                    self.config['feature_columns'],
+                    self._model_features(),
                     self.models[f'{res_type}_rf'].feature_importances_
                 ))
                 
                 # Evaluate
-                preds = self.models[f'{res_type}_rf'].predict(X_test)
+                with self._timed('rf_eval'):
+                    preds = self.models[f'{res_type}_rf'].predict(X_test)
                 print(f"{res_type} RF - MAE: {mean_absolute_error(y_test, preds):.2f}")
         
         # Train LSTM models
         if self.config['model_type'] in ['lstm', 'hybrid'] and processed['X_seq'] is not None:
-            for i, res_type in enumerate(self.config['resource_types']):
-                X_train, X_test, y_train, y_test = train_test_split(
-                    processed['X_seq'],
-                    processed['y_seq'][:, i],
-                    test_size=0.2
+            with self._timed('lstm_fit'):
+                for i, res_type in enumerate(self.config['resource_types']):
+                    self._fit_lstm(
+                        self.models[f'{res_type}_lstm'],
+                        processed['X_seq'],
+                        processed['y_seq'][:, i:i + 1]
+                    )
+    
+    def _train_parallel(self, processed):
+        """
+        Train the per-resource forests concurrently in a process pool and all
+        per-resource LSTMs together in one graph
+        """
+        res_types = self.config['resource_types']
+        
+        if self.config['model_type'] in ['rf', 'hybrid']:
+            X_train, X_test, y_train, y_test = train_test_split(
+                processed['X_rf'],
+                processed['y_rf'],
+                test_size=0.2
+            )
+            
+            # Split the cores between forests so workers don't oversubscribe
+            cores = joblib.cpu_count() if self.config.get('n_jobs', -1) == -1 else self.config['n_jobs']
+            workers = max(1, min(len(res_types), cores))
+            with self._timed('rf_fit'):
+                fitted = Parallel(n_jobs=workers, backend='loky')(
+                    delayed(_fit_forest)(
+                        self.models[f'{res_type}_rf'], X_train, y_train[res_type], max(1, cores // workers)
+                    )
+                    for res_type in res_types
                 )
-                self.models[f'{res_type}_lstm'].fit(
-                    X_train, y_train,
-                    validation_data=(X_test, y_test),
-                    epochs=50,
-                    batch_size=32,
-                    verbose=1
+            
+            with self._timed('rf_eval'):
+                for res_type, model in zip(res_types, fitted):
+                    self.models[f'{res_type}_rf'] = model
+                    self.feature_importances[res_type] = dict(zip(
+                        self._model_features(),
+                        model.feature_importances_
+                    ))
+                    preds = model.predict(X_test)
+                    print(f"{res_type} RF - MAE: {mean_absolute_error(y_test[res_type], preds):.2f}")
+        
+        if self.config['model_type'] in ['lstm', 'hybrid'] and processed['X_seq'] is not None:
+            # Wrap the per-resource LSTMs in one model so a single fit updates
+            # all of them; each keeps its own weights for prediction and saving
+            combined = self._combined_lstm(
+                [self.models[f'{res_type}_lstm'] for res_type in res_types],
+                processed['X_seq'].shape[1:]
+            )
+            
+            with self._timed('lstm_fit'):
+                self._fit_lstm(combined, processed['X_seq'], processed['y_seq'])
+    
+    def _combined_lstm(self, lstms, input_shape):
+        """One trainable model whose output concatenates the given per-resource LSTMs"""
+        inputs = tf.keras.Input(shape=input_shape)
+        combined = tf.keras.Model(
+            inputs, tf.keras.layers.Concatenate()([lstm(inputs) for lstm in lstms])
+        )
+        combined.compile(optimizer=Adam(learning_rate=0.001), loss='mse', metrics=['mae'])
+        return combined
+    
+    def update(self, new_data: pd.DataFrame, recent_history: pd.DataFrame = None) -> Dict:
+        """
+        Incorporate new field observations without a full retrain
+        
+        Forests grow 'new_trees' warm-started trees fitted on the new rows and
+        drop their oldest trees beyond 'max_trees'; LSTMs are fine-tuned for
+        'lstm_epochs' on windows from the most recent rows. Updated models are
+        built on copies and swapped in atomically, so predictions keep being
+        served meanwhile. The fitted feature pipeline is reused as-is.
+        Args:
+            new_data: New records with feature_columns + resource_types
+            recent_history: Recent records (ending with new_data) to build LSTM
+                windows from; defaults to new_data
+        Returns:
+            Summary of the update
+        """
+        settings = self.config.get('incremental') or {
+            'new_trees': 10, 'max_trees': 200, 'lstm_epochs': 2
+        }
+        start = time.perf_counter()
+        models = dict(self.models)
+        summary = {'rows': len(new_data)}
+        
+        X_new = self.feature_pipeline.transform(new_data)
+        y_new = new_data[self.config['resource_types']]
+        self._update_count += 1
+        
+        for name in [n for n in models if 'lstm' not in n]:
+            forest = copy.deepcopy(models[name])
+            target = y_new if name == 'multi_rf' else y_new[name[:-len('_rf')]]
+            forest.set_params(warm_start=True, n_estimators=len(forest.estimators_) + settings['new_trees'])
+            if forest.random_state is not None:
+                # Warm start seeds new trees by their position, which stops moving
+                # once the forest is trimmed at max_trees; reseed per update so
+                # new trees get fresh bootstrap and feature draws
+                base_seed = forest.random_state if isinstance(forest.random_state, int) else 0
+                forest.set_params(random_state=int(
+                    np.random.SeedSequence([base_seed, self._update_count]).generate_state(1)[0]
+                ))
+            forest.fit(X_new, target)
+            
+            # Replace the oldest trees once the forest is full
+            if len(forest.estimators_) > settings['max_trees']:
+                forest.estimators_ = forest.estimators_[-settings['max_trees']:]
+            forest.set_params(warm_start=False, n_estimators=len(forest.estimators_))
+            models[name] = forest
+        
+        history = recent_history if recent_history is not None else new_data
+        X_seq, y_seq = self._create_sequences(pd.concat(
+            [self.feature_pipeline.transform(history), history[self.config['resource_types']]], axis=1
+        ))
+        lstm_names = [n for n in models if 'lstm' in n]
+        if lstm_names and len(X_seq):
+            for name in lstm_names:
+                models[name] = self._copy_lstm(models[name])
+            
+            if 'multi_lstm' in models:
+                trainable = models['multi_lstm']
+            else:
+                trainable = self._combined_lstm(
+                    [models[f'{res_type}_lstm'] for res_type in self.config['resource_types']],
+                    X_seq.shape[1:]
                 )
+            trainable.fit(
+                np.ascontiguousarray(X_seq), y_seq,
+                epochs=settings['lstm_epochs'],
+                batch_size=32,
+                verbose=0
+            )
+            summary['lstm_windows'] = len(X_seq)
+        
+        with self._model_lock:
+            self.models = models
+            self._models_changed(X_new.iloc[:256])
+        
+        summary['trees'] = {n: len(m.estimators_) for n, m in models.items() if 'lstm' not in n}
+        summary['seconds'] = round(time.perf_counter() - start, 3)
+        return summary
+    
+    def _copy_lstm(self, model):
+        """Independent compiled copy of a Keras model, so the live one keeps serving"""
+        clone = tf.keras.models.clone_model(model)
+        clone.set_weights(model.get_weights())
+        clone.compile(optimizer=Adam(learning_rate=0.001), loss='mse', metrics=['mae'])
+        return clone
+    
+    def start_incremental_updates(self, fetch_new_data, interval: int = None):
+        """
+        Run update() on a background schedule
+        Args:
+            fetch_new_data: Callable returning (new_data, recent_history) or None
+                when there is nothing new, e.g. a BigQuery pull via GCPService
+            interval: Seconds between updates (defaults to config)
+        """
+        if self._update_thread and self._update_thread.is_alive():
+            return
+        interval = interval or (self.config.get('incremental') or {}).get('interval', 600)
+        
+        def run():
+            while not self._update_stop.wait(interval):
+                try:
+                    batch = fetch_new_data()
+                    if batch is None:
+                        continue
+                    new_data, recent_history = batch
+                    if len(new_data):
+                        summary = self.update(new_data, recent_history)
+                        self.logger.info(f"Incremental update applied: {summary}")
+                except Exception as e:
+                    self.logger.error(f"Incremental update failed: {str(e)}")
+        
+        self._update_stop.clear()
+        self._update_thread = threading.Thread(target=run, name='resource-predictor-updates', daemon=True)
+        self._update_thread.start()
+    
+    def stop_incremental_updates(self, timeout: float = None):
+        """Stop the background update thread"""
+        self._update_stop.set()
+        if self._update_thread:
+            self._update_thread.join(timeout)
+            self._update_thread = None
+    
+    def _train_multi_output(self, processed):
+        """Train the single multi-target forest and the single multi-output LSTM"""
+        if self.config['model_type'] in ['rf', 'hybrid']:
+            X_train, X_test, y_train, y_test = train_test_split(
+                processed['X_rf'],
+                processed['y_rf'],
+                test_size=0.2
+            )
+            cores = joblib.cpu_count() if self.config.get('n_jobs', -1) == -1 else self.config['n_jobs']
+            with self._timed('rf_fit'):
+                self.models['multi_rf'] = _fit_forest(self.models['multi_rf'], X_train, y_train, cores)
+            
+            # A multi-target forest shares one set of split importances
+            importances = dict(zip(
+                self._model_features(),
+                self.models['multi_rf'].feature_importances_
+            ))
+            with self._timed('rf_eval'):
+                preds = self.models['multi_rf'].predict(X_test)
+            for i, res_type in enumerate(self.config['resource_types']):
+                self.feature_importances[res_type] = importances
+                print(f"{res_type} RF - MAE: {mean_absolute_error(y_test[res_type], preds[:, i]):.2f}")
+        
+        if self.config['model_type'] in ['lstm', 'hybrid'] and processed['X_seq'] is not None:
+            with self._timed('lstm_fit'):
+                self._fit_lstm(self.models['multi_lstm'], processed['X_seq'], processed['y_seq'])
     
-    def predict(self, current_conditions: Dict, days_ahead: int = 7) -> Dict:
+    def predict(self, current_conditions: Dict, days_ahead: int = 7, intervals: bool = False) -> Dict:
         """
         Predict resource needs based on current situation
         Args:
             current_conditions: Dictionary of current disaster features
             days_ahead: Prediction horizon (1-7 days)
+            intervals: Also return forest-tree percentile bands (needs a
+                per-tree pass, so the compiled forest backend is bypassed)
         Returns:
-            Dictionary of resource predictions with confidence intervals
+            Dictionary of resource predictions, plus 'intervals' when requested
         """
+        if self.prediction_cache is None:
+            return self._predict_uncached(current_conditions, days_ahead, intervals)
+        
+        # Predict on the canonical (quantized) conditions so a cached entry is
+        # exactly the prediction for its key
+        conditions, key = self.prediction_cache.canonicalize(current_conditions, days_ahead)
+        if intervals:
+            key = f'{key}|intervals'
+        cached = self.prediction_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Read before predicting: an update() that lands meanwhile clears the
+        # cache, and this result must not repopulate it
+        generation = self.prediction_cache.generation
+        result = self._predict_uncached(conditions, days_ahead, intervals)
+        self.prediction_cache.put(key, result, generation)
+        return result
+    
+    def invalidate_prediction_cache(self):
+        """Drop memoized predictions; called whenever the models change"""
+        if self.prediction_cache is not None:
+            self.prediction_cache.clear()
+    
+    def cache_stats(self) -> Dict:
+        """Hit rate and occupancy of the prediction cache"""
+        if self.prediction_cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.prediction_cache.stats()}
+    
+    def _predict_uncached(self, current_conditions: Dict, days_ahead: int, intervals: bool = False) -> Dict:
+        """Run the models for one set of conditions"""
         # Prepare input data
         input_df = self._prepare_prediction_input(current_conditions, days_ahead)
-        predictions = {}
+        with self._model_lock:
+            combined, bands = self._estimate(input_df, 1, days_ahead, intervals)
         
-        for res_type in self.config['resource_types']:
-            # RF prediction
-            rf_pred = self.models[f'{res_type}_rf'].predict(input_df)[0]
-            
-            # LSTM prediction if hybrid
-            if self.config['model_type'] == 'hybrid':
-                lstm_pred = self.models[f'{res_type}_lstm'].predict(
-                    input_df.values.reshape(1, days_ahead, -1)
-                )[0][0]
-                predictions[res_type] = (rf_pred + lstm_pred) / 2  # Average both predictions
-            else:
-                predictions[res_type] = rf_pred
+        predictions = {
+            res_type: float(combined[0, i])
+            for i, res_type in enumerate(self.config['resource_types'])
+        }
+        result = {'predictions': predictions}
+        
+        if bands is not None:
+            result['intervals'] = {
+                res_type: {
+                    f'p{q}': float(bands[j, 0, i])
+                    for j, q in enumerate(self.config['prediction_intervals'])
+                }
+                for i, res_type in enumerate(self.config['resource_types'])
+            }
                 
         return {
-            'predictions': predictions,
+            **result,
             'feature_importances': self.feature_importances,
             'timestamp': datetime.now().isoformat()
         }
     
+    def predict_many(self, sites: Union[List[Dict], pd.DataFrame], days_ahead: int = 7,
+                     intervals: bool = False) -> pd.DataFrame:
+        """
+        Predict resource needs for many disaster sites at once
+        Args:
+            sites: List of condition dicts or a DataFrame with one row per site;
+                an optional 'site_id' column/key labels the output rows
+            days_ahead: Prediction horizon (1-7 days)
+            intervals: Add '<resource>_p<q>' forest-tree percentile columns
+        Returns:
+            Columnar DataFrame with one row per (site_id, day) and one column per
+            resource type; day 0 matches what predict() returns for that site
+        """
+        sites_df = sites.reset_index(drop=True) if isinstance(sites, pd.DataFrame) else pd.DataFrame(sites)
+        if 'site_id' in sites_df.columns:
+            site_ids = sites_df['site_id'].to_numpy()
+            sites_df = sites_df.drop(columns=['site_id'])
+        else:
+            site_ids = np.arange(len(sites_df))
+        
+        # Feature matrix for all sites x days, evaluated with one call per model
+        input_df = self._prepare_batch_input(sites_df, days_ahead)
+        with self._model_lock:
+            combined, bands = self._estimate(input_df, len(sites_df), days_ahead, intervals)
+        
+        result = pd.DataFrame(combined, columns=self.config['resource_types'])
+        if bands is not None:
+            for j, q in enumerate(self.config['prediction_intervals']):
+                for i, res_type in enumerate(self.config['resource_types']):
+                    result[f'{res_type}_p{q}'] = bands[j, :, i]
+        result.insert(0, 'day', np.tile(np.arange(days_ahead), len(sites_df)))
+        result.insert(0, 'site_id', np.repeat(site_ids, days_ahead))
+        return result
+    
+    def _estimate(self, input_df: pd.DataFrame, n_sites: int, days_ahead: int, intervals: bool = False):
+        """
+        Run the models over a sites x days input frame
+        Returns:
+            (point estimates [rows, resource_types],
+             percentile bands [quantiles, rows, resource_types] or None)
+            Bands are the raw spread of the forest trees; they are not shifted
+            towards the LSTM, so they stay non-negative like the training targets.
+        """
+        rf_preds = lstm_preds = bands = None
+        quantiles = self.config.get('prediction_intervals') if intervals else None
+        
+        if self.config['model_type'] in ['rf', 'hybrid']:
+            if quantiles:
+                # The tree mean is exactly the forest prediction, so bands cost
+                # no extra model pass
+                trees = self._rf_tree_predictions(input_df)
+                rf_preds = trees.mean(axis=1)
+                bands = np.percentile(trees, quantiles, axis=1)
+            else:
+                rf_preds = self._predict_rf(input_df)
+        
+        if self.config['model_type'] in ['lstm', 'hybrid']:
+            lstm_preds = np.repeat(
+                self._predict_lstm(input_df.values.reshape(n_sites, days_ahead, -1)),
+                days_ahead, axis=0
+            )
+        
+        # Average both predictions when hybrid
+        combined = np.mean([p for p in (rf_preds, lstm_preds) if p is not None], axis=0)
+        if bands is not None:
+            bands = np.maximum(bands, 0)
+        return combined, bands
+    
+    def _rf_tree_predictions(self, X) -> np.ndarray:
+        """
+        Per-tree forest predictions as [rows, trees, resource_types], from one
+        apply() per forest and a gather from precomputed leaf value tables
+        """
+        if self.config.get('multi_output', False):
+            names = ['multi_rf']
+        else:
+            names = [f'{res_type}_rf' for res_type in self.config['resource_types']]
+        
+        per_forest = []
+        for name in names:
+            leaves = self.models[name].apply(X)  # [rows, trees]
+            table = self._leaf_table(name)       # [trees, nodes, outputs]
+            per_forest.append(table[np.arange(leaves.shape[1]), leaves])
+        return np.concatenate(per_forest, axis=2)
+    
+    def _leaf_table(self, name: str) -> np.ndarray:
+        """Leaf values of every tree in a forest, padded to [trees, max_nodes, outputs]"""
+        if name not in self._leaf_tables:
+            trees = [est.tree_ for est in self.models[name].estimators_]
+            table = np.zeros((len(trees), max(t.node_count for t in trees), trees[0].n_outputs))
+            for i, tree in enumerate(trees):
+                table[i, :tree.node_count] = tree.value[:, :, 0]
+            self._leaf_tables[name] = table
+        return self._leaf_tables[name]
+    
+    def _models_changed(self, X_sample=None):
+        """Rebuild state derived from the fitted models (compiled forests, leaf tables, cache)"""
+        self._leaf_tables = {}
+        if self.config['model_type'] in ['rf', 'hybrid']:
+            self.compile_forests(X_sample)
+        self.invalidate_prediction_cache()
+    
+    def compile_forests(self, X_sample=None) -> Dict:
+        """
+        Convert the fitted forests to the compiled backend selected by 'rf_backend'
+        
+        Each forest falls back to sklearn if the runtime is missing, conversion
+        fails, or its predictions diverge from sklearn on X_sample.
+        Args:
+            X_sample: Encoded inputs for the parity check (random if omitted)
+        Returns:
+            {model_name: CompiledForest} for the forests that compiled
+        """
+        self.compiled_forests = {}
+        self.invalidate_prediction_cache()
+        if self.config.get('rf_backend', 'sklearn') != 'onnx':
+            return self.compiled_forests
+        
+        n_features = len(self._model_features())
+        if X_sample is None:
+            X_sample = np.random.default_rng(0).normal(size=(256, n_features))
+        
+        for name, model in self.models.items():
+            if 'lstm' in name:
+                continue
+            try:
+                compiled = CompiledForest(model, n_features)
+                compiled.check_parity(model, X_sample)
+                self.compiled_forests[name] = compiled
+            except Exception as e:
+                self.logger.warning(f"{name}: compiled backend unavailable, using sklearn ({str(e)})")
+        
+        return self.compiled_forests
+    
+    def _forest(self, name):
+        """Compiled forest when available, otherwise the sklearn model"""
+        return self.compiled_forests.get(name) or self.models[name]
+    
+    def _predict_rf(self, X) -> np.ndarray:
+        """Random Forest predictions as a [rows, resource_types] matrix"""
+        if self.compiled_forests:
+            X = np.asarray(X, dtype=np.float32)
+        if self.config.get('multi_output', False):
+            return np.asarray(self._forest('multi_rf').predict(X)).reshape(len(X), -1)
+        return np.column_stack([
+            self._forest(f'{res_type}_rf').predict(X)
+            for res_type in self.config['resource_types']
+        ])
+    
+    def _predict_lstm(self, X_seq) -> np.ndarray:
+        """LSTM predictions as a [sequences, resource_types] matrix"""
+        if self.config.get('multi_output', False):
+            return np.asarray(self.models['multi_lstm'].predict(X_seq, verbose=0))
+        return np.column_stack([
+            self.models[f'{res_type}_lstm'].predict(X_seq, verbose=0)[:, 0]
+            for res_type in self.config['resource_types']
+        ])
+    
     def _prepare_prediction_input(self, conditions: Dict, days: int) -> pd.DataFrame:
         """Create input DataFrame for prediction"""
-        # Create sequence of future days
-        future_days = []
-        for day in range(days):
-            day_conditions = conditions.copy()
-            day_conditions['time_since_disaster'] = day
-            future_days.append(day_conditions)
+        return self._prepare_batch_input(pd.DataFrame([conditions]), days)
+    
+    def _prepare_batch_input(self, sites: pd.DataFrame, days: int) -> pd.DataFrame:
+        """Create input DataFrame of sites x future days in one vectorized step"""
+        sites = sites.reset_index(drop=True)
+        frame = sites.loc[sites.index.repeat(days)].reset_index(drop=True)
+        frame['time_since_disaster'] = np.tile(np.arange(days), len(sites))
         
-        return pd.DataFrame(future_days)
+        # Apply the same encoding and scaling the models were trained with
+        if self.feature_pipeline.is_fitted:
+            return self.feature_pipeline.transform(frame)
+        return frame
     
     def optimize_allocation(self, predictions: Dict, inventory: Dict) -> Dict:
         """
@@ -266,24 +876,112 @@ class ResourcePredictor:
             else:
                 joblib.dump(model, f"{directory}/{name}.joblib")
         
-        # Save configuration
+        # Save configuration and fitted feature pipeline
         with open(f"{directory}/config.json", 'w') as f:
             json.dump(self.config, f)
+        self.feature_pipeline.save(f"{directory}/feature_pipeline.json")
     
     @classmethod
     def load_models(cls, directory: str):
-        """Load saved models from disk"""
+        """Load saved models from disk (either save_models() or save_bundle() output)"""
+        if os.path.exists(f"{directory}/manifest.json"):
+            return cls.load_bundle(directory)
+        
         with open(f"{directory}/config.json", 'r') as f:
             config = json.load(f)
             
-        instance = cls(config)
+        instance = cls(config, initialize_models=False)
+        if os.path.exists(f"{directory}/feature_pipeline.json"):
+            instance.feature_pipeline = FeaturePipeline.load(f"{directory}/feature_pipeline.json")
+            instance.scalers = instance.feature_pipeline.scalers
         
-        for name in instance.models.keys():
+        for name in instance._model_names():
             if 'lstm' in name:
                 instance.models[name] = tf.keras.models.load_model(f"{directory}/{name}.h5")
             else:
                 instance.models[name] = joblib.load(f"{directory}/{name}.joblib")
-                
+        
+        instance._models_changed()
+        return instance
+    
+    def save_bundle(self, directory: str, compress: int = 0):
+        """
+        Save a single versioned artifact: manifest.json, forests as joblib arrays
+        and LSTMs as native .keras files
+        Args:
+            directory: Bundle directory (an existing bundle is swapped out, so
+                the path always holds a complete bundle)
+            compress: joblib compression level; 0 keeps forests memory-mappable
+        """
+        staging = f"{directory}.tmp"
+        if os.path.exists(staging):
+            shutil.rmtree(staging)
+        os.makedirs(f"{staging}/forests")
+        os.makedirs(f"{staging}/lstm")
+        
+        artifacts = {}
+        for name, model in self.models.items():
+            if 'lstm' in name:
+                artifacts[name] = f"lstm/{name}.keras"
+                model.save(f"{staging}/{artifacts[name]}")
+            else:
+                artifacts[name] = f"forests/{name}.joblib"
+                joblib.dump(model, f"{staging}/{artifacts[name]}", compress=compress)
+        
+        manifest = {
+            'format_version': self.BUNDLE_FORMAT_VERSION,
+            'created_at': datetime.now().isoformat(),
+            'config': self.config,
+            'feature_pipeline': self.feature_pipeline.to_dict(),
+            'feature_importances': self.feature_importances,
+            'artifacts': artifacts,
+            'compress': compress
+        }
+        with open(f"{staging}/manifest.json", 'w') as f:
+            json.dump(manifest, f, default=float)
+        
+        # Move the old bundle aside before swapping, never deleting it first
+        previous = f"{directory}.old"
+        if os.path.exists(previous):
+            shutil.rmtree(previous)
+        if os.path.exists(directory):
+            os.replace(directory, previous)
+        os.replace(staging, directory)
+        if os.path.exists(previous):
+            shutil.rmtree(previous)
+    
+    @classmethod
+    def load_bundle(cls, directory: str, mmap: bool = True):
+        """
+        Load a save_bundle() artifact without building throwaway models
+        Args:
+            directory: Bundle directory
+            mmap: Memory-map uncompressed forest arrays instead of reading them
+        Returns:
+            ResourcePredictor instance
+        """
+        with open(f"{directory}/manifest.json", 'r') as f:
+            manifest = json.load(f)
+        
+        if manifest['format_version'] > cls.BUNDLE_FORMAT_VERSION:
+            raise ValueError(
+                f"Bundle format {manifest['format_version']} is newer than supported "
+                f"version {cls.BUNDLE_FORMAT_VERSION}"
+            )
+        
+        instance = cls(manifest['config'], initialize_models=False)
+        instance.feature_pipeline = FeaturePipeline.from_dict(manifest['feature_pipeline'])
+        instance.scalers = instance.feature_pipeline.scalers
+        instance.feature_importances = manifest.get('feature_importances', {})
+        
+        mmap_mode = 'r' if mmap and not manifest.get('compress') else None
+        for name, path in manifest['artifacts'].items():
+            if 'lstm' in name:
+                instance.models[name] = tf.keras.models.load_model(f"{directory}/{path}")
+            else:
+                instance.models[name] = joblib.load(f"{directory}/{path}", mmap_mode=mmap_mode)
+        
+        instance._models_changed()
         return instance
     
     def deploy_to_vertex(self, vertex_service, endpoint_name='resource-predictor'):
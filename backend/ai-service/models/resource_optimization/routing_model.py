@@ -0,0 +1,144 @@
+# ai-service/models/resource_optimization/routing_model.py
+import time
+import numpy as np
+from typing import Dict, List
+from ortools.constraint_solver import pywrapcp, routing_enums_pb2
+
+class FleetRouter:
+    def __init__(self, config=None):
+        """
+        Capacitated vehicle routing with time windows (CVRPTW) over several
+        depots, using the OR-Tools routing library
+
+        Args:
+            config (dict): Configuration parameters
+        """
+        self.config = config or {
+            'first_solution_strategy': 'PATH_CHEAPEST_ARC',
+            'local_search_metaheuristic': 'GUIDED_LOCAL_SEARCH',
+            'time_limit_ms': 500,        # Search budget per request
+            'service_minutes': 10,       # Unloading time at each stop
+            'drop_penalty': 10000000     # Cost of leaving a stop unserved
+        }
+
+    def route(self, n_depots: int, vehicles: List[Dict], stops: List[Dict],
+              distances: np.ndarray) -> Dict:
+        """
+        Assign stops to vehicles and order them into routes
+        Args:
+            n_depots: Nodes 0..n_depots-1 are depots, the rest are stops in order
+            vehicles: [{'depot': int, 'mode': str, 'capacity': int, 'speed': km/h, 'cost': per km}]
+            stops: [{'demand': int, 'window': (earliest_min, latest_min), 'depot': int}]
+                where 'depot' is the only depot allowed to serve the stop
+            distances: [nodes, nodes] km
+        Returns:
+            {
+                'routes': [{'vehicle': int, 'stops': [{'stop': int, 'arrival_min': int}],
+                            'distance_km': float, 'duration_min': int, 'load': int}],
+                'dropped': [stop indices], 'objective': int, 'solve_ms': float
+            }
+        """
+        n_nodes = n_depots + len(stops)
+        starts = [v['depot'] for v in vehicles]
+        manager = pywrapcp.RoutingIndexManager(n_nodes, len(vehicles), starts, starts)
+        routing = pywrapcp.RoutingModel(manager)
+
+        # Integer matrices as nested lists: callbacks index them once per arc
+        meters = np.rint(distances * 1000).astype(np.int64)
+        service = np.full(n_nodes, self.config['service_minutes'], dtype=np.int64)
+        service[:n_depots] = 0
+        demands = [0] * n_depots + [int(stop['demand']) for stop in stops]
+
+        # One transit/cost callback per mode, shared by that mode's vehicles
+        time_callbacks = {}
+        cost_callbacks = {}
+        for v in vehicles:
+            mode = v['mode']
+            if mode in time_callbacks:
+                continue
+            minutes = (np.rint(distances / v['speed'] * 60).astype(np.int64) + service[:, None]).tolist()
+            costs = np.rint(meters * v['cost']).astype(np.int64).tolist()
+            time_callbacks[mode] = routing.RegisterTransitCallback(
+                lambda i, j, m=minutes: m[manager.IndexToNode(i)][manager.IndexToNode(j)]
+            )
+            cost_callbacks[mode] = routing.RegisterTransitCallback(
+                lambda i, j, c=costs: c[manager.IndexToNode(i)][manager.IndexToNode(j)]
+            )
+        for k, v in enumerate(vehicles):
+            routing.SetArcCostEvaluatorOfVehicle(cost_callbacks[v['mode']], k)
+
+        # Capacity
+        demand_callback = routing.RegisterUnaryTransitCallback(
+            lambda i: demands[manager.IndexToNode(i)]
+        )
+        routing.AddDimensionWithVehicleCapacity(
+            demand_callback, 0, [int(v['capacity']) for v in vehicles], True, 'Load'
+        )
+
+        # Travel time with per-stop windows; vehicles may wait, and the horizon
+        # leaves room for the trip back to the depot
+        horizon = max(stop['window'][1] for stop in stops) * 2 if stops else 0
+        routing.AddDimensionWithVehicleTransits(
+            [time_callbacks[v['mode']] for v in vehicles], horizon, horizon, True, 'Time'
+        )
+        time_dimension = routing.GetDimensionOrDie('Time')
+
+        meters_list = meters.tolist()
+        for i, stop in enumerate(stops):
+            index = manager.NodeToIndex(n_depots + i)
+            time_dimension.CumulVar(index).SetRange(int(stop['window'][0]), int(stop['window'][1]))
+            # Loads leave from their own warehouse only; -1 lets the stop be dropped
+            allowed = [k for k, v in enumerate(vehicles) if v['depot'] == stop['depot']]
+            routing.VehicleVar(index).SetValues([-1] + allowed)
+            routing.AddDisjunction([index], int(stop.get('penalty', self.config['drop_penalty'])))
+
+        params = pywrapcp.DefaultRoutingSearchParameters()
+        params.first_solution_strategy = getattr(
+            routing_enums_pb2.FirstSolutionStrategy, self.config['first_solution_strategy']
+        )
+        params.local_search_metaheuristic = getattr(
+            routing_enums_pb2.LocalSearchMetaheuristic, self.config['local_search_metaheuristic']
+        )
+        params.time_limit.FromMilliseconds(int(self.config['time_limit_ms']))
+
+        solve_start = time.perf_counter()
+        solution = routing.SolveWithParameters(params)
+        solve_ms = round((time.perf_counter() - solve_start) * 1000, 3)
+        if solution is None:
+            raise RuntimeError("No routing solution found")
+
+        load_dimension = routing.GetDimensionOrDie('Load')
+        routes = []
+        for k in range(len(vehicles)):
+            index = solution.Value(routing.NextVar(routing.Start(k)))
+            if routing.IsEnd(index):
+                continue  # Vehicle unused
+
+            route = {'vehicle': k, 'stops': [], 'distance_km': 0.0}
+            previous = manager.IndexToNode(routing.Start(k))
+            while not routing.IsEnd(index):
+                node = manager.IndexToNode(index)
+                route['stops'].append({
+                    'stop': node - n_depots,
+                    'arrival_min': solution.Min(time_dimension.CumulVar(index))
+                })
+                route['distance_km'] += meters_list[previous][node] / 1000
+                previous = node
+                index = solution.Value(routing.NextVar(index))
+            route['distance_km'] += meters_list[previous][manager.IndexToNode(index)] / 1000
+            route['distance_km'] = round(route['distance_km'], 3)
+            route['duration_min'] = solution.Min(time_dimension.CumulVar(index))
+            route['load'] = solution.Min(load_dimension.CumulVar(index))
+            routes.append(route)
+
+        dropped = [
+            i for i in range(len(stops))
+            if solution.Value(routing.NextVar(manager.NodeToIndex(n_depots + i))) ==
+            manager.NodeToIndex(n_depots + i)
+        ]
+        return {
+            'routes': routes,
+            'dropped': dropped,
+            'objective': solution.ObjectiveValue(),
+            'solve_ms': solve_ms
+        }
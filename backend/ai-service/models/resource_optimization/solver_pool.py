@@ -0,0 +1,93 @@
+# ai-service/models/resource_optimization/solver_pool.py
+import queue
+import threading
+from contextlib import contextmanager
+from ortools.linear_solver import pywraplp
+
+# Config names -> pywraplp.Solver.CreateSolver ids
+SOLVER_BACKENDS = {
+    'SCIP': 'SCIP',
+    'CBC': 'CBC',
+    'GLOP': 'GLOP',      # LP only: integer variables are relaxed
+    'CP-SAT': 'CP_SAT'
+}
+
+STATUS_NAMES = {
+    pywraplp.Solver.OPTIMAL: 'OPTIMAL',
+    pywraplp.Solver.FEASIBLE: 'FEASIBLE',
+    pywraplp.Solver.INFEASIBLE: 'INFEASIBLE',
+    pywraplp.Solver.UNBOUNDED: 'UNBOUNDED',
+    pywraplp.Solver.ABNORMAL: 'ABNORMAL',
+    pywraplp.Solver.NOT_SOLVED: 'NOT_SOLVED'
+}
+
+class SolverPool:
+    def __init__(self, backend: str = 'SCIP', size: int = 4):
+        """
+        Pool of reusable pywraplp solver instances. Each checkout gets an
+        empty model, so requests never see each other's variables or
+        constraints, and concurrent requests use separate instances.
+
+        Args:
+            backend: Default backend ('SCIP', 'CBC', 'GLOP', 'CP-SAT')
+            size: Maximum instances per backend
+        """
+        if backend not in SOLVER_BACKENDS:
+            raise ValueError(f"Unsupported solver backend: {backend}")
+        self.backend = backend
+        self.size = size
+        self._idle = {name: queue.LifoQueue() for name in SOLVER_BACKENDS}
+        self._created = {name: 0 for name in SOLVER_BACKENDS}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def acquire(self, backend: str = None, timeout: float = None):
+        """
+        Check out a cleared solver for the duration of a request
+        Args:
+            backend: Backend override for this request
+            timeout: Seconds to wait when all instances are busy (None = forever)
+        """
+        backend = backend or self.backend
+        if backend not in SOLVER_BACKENDS:
+            raise ValueError(f"Unsupported solver backend: {backend}")
+
+        solver = self._checkout(backend, timeout)
+        solver.Clear()
+        try:
+            yield solver
+        finally:
+            solver.Clear()
+            self._idle[backend].put(solver)
+
+    def stats(self) -> dict:
+        return {
+            name: {'created': self._created[name], 'idle': self._idle[name].qsize()}
+            for name in SOLVER_BACKENDS
+            if self._created[name]
+        }
+
+    def _checkout(self, backend, timeout):
+        """Reuse an idle (most recently used) instance, create one, or wait"""
+        try:
+            return self._idle[backend].get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created[backend] < self.size
+            if can_create:
+                self._created[backend] += 1
+
+        if can_create:
+            solver = pywraplp.Solver.CreateSolver(SOLVER_BACKENDS[backend])
+            if solver is None:
+                with self._lock:
+                    self._created[backend] -= 1
+                raise RuntimeError(f"Solver backend {backend} is not available in this OR-Tools build")
+            return solver
+
+        try:
+            return self._idle[backend].get(timeout=timeout)
+        except queue.Empty:
+            raise RuntimeError(f"No {backend} solver available within {timeout}s")
@@ -0,0 +1,329 @@
+# ai-service/models/resource_optimization/stochastic_allocation.py
+import time
+import numpy as np
+from collections import defaultdict
+from typing import Callable, Dict, List
+from ortools.linear_solver import pywraplp
+
+class TwoStageAllocator:
+    def __init__(self, allocator, config=None):
+        """
+        Two-stage stochastic allocation: stock is prepositioned from warehouses to
+        staging hubs before demand is known (first stage), then each demand
+        scenario is served from hubs and the remaining warehouse stock (recourse).
+        Solved as an LP with multi-cut L-shaped (Benders) decomposition, one
+        GLOP subproblem per scenario.
+
+        Args:
+            allocator: ResourceAllocator providing transport modes, response
+                time, priorities and the cached distance network
+            config (dict): Configuration parameters
+        """
+        self.allocator = allocator
+        self.config = config or {
+            'preposition_cost': 0.2,  # Per unit moved to a hub ahead of time
+            'max_iterations': 100,
+            'tolerance': 1e-4         # Relative gap between master bound and best plan
+        }
+
+    def solve(self, warehouses: List[Dict], hubs: List[Dict], sites: List[Dict],
+              scenarios: List[Dict]) -> Dict:
+        """
+        Find the prepositioning plan with the lowest expected total cost
+        Args:
+            warehouses: [{'id': 'w1', 'inventory': {...}, 'position': (lat, lon)}]
+            hubs: [{'id': 'h1', 'position': (lat, lon), 'capacity': units (optional)}]
+            sites: [{'id': 'd1', 'position': (lat, lon), 'priority': 1.0}]
+            scenarios: [{'name': 's1', 'probability': p, 'demands': {site_id: {'resource_type': amount}}}]
+                (probabilities default to uniform)
+        Returns:
+            Prepositioning plan, expected cost breakdown, per-scenario recourse
+            results and decomposition statistics
+        """
+        model = self._build(warehouses, hubs, sites, scenarios)
+        result, _ = self._decompose(model)
+        return result
+
+    def sample_average_approximation(self, warehouses: List[Dict], hubs: List[Dict], sites: List[Dict],
+                                     sample_scenarios: Callable, n_scenarios: int = 50,
+                                     n_replications: int = 5, n_evaluation: int = 500,
+                                     seed: int = None) -> Dict:
+        """
+        Sample-average approximation: solve several sampled problems, then pick
+        the candidate plan with the best cost on a large independent sample
+        Args:
+            warehouses, hubs, sites: As in solve()
+            sample_scenarios: Callable (rng, n) -> n scenarios in solve() format
+            n_scenarios: Scenarios per replication
+            n_replications: Independent sampled problems
+            n_evaluation: Scenarios used to evaluate the candidate plans
+            seed: Random seed
+        Returns:
+            {'plan': best candidate, 'lower_bound': {...}, 'upper_bound': {...},
+             'gap': float, 'replications': [...]}
+        """
+        rng = np.random.default_rng(seed)
+        candidates = []
+        for _ in range(n_replications):
+            model = self._build(warehouses, hubs, sites, sample_scenarios(rng, n_scenarios))
+            candidates.append(self._decompose(model))
+
+        # Mean of sampled optima is a statistical lower bound on the true optimum
+        optima = np.array([result['expected_cost'] for result, _ in candidates])
+
+        evaluation = self._build(warehouses, hubs, sites, sample_scenarios(rng, n_evaluation))
+        estimates = []
+        for result, X in candidates:
+            costs, _, fulfillment = self._evaluate(evaluation, self._capacity(evaluation, X), duals=False)
+            total = result['first_stage_cost'] + costs
+            estimates.append({
+                'mean': float(total.mean()),
+                'std_error': float(total.std(ddof=1) / np.sqrt(len(total))) if len(total) > 1 else 0.0,
+                'worst_case_fulfillment': float(fulfillment.min())
+            })
+
+        best = int(np.argmin([e['mean'] for e in estimates]))
+        lower = {
+            'mean': float(optima.mean()),
+            'std_error': float(optima.std(ddof=1) / np.sqrt(len(optima))) if len(optima) > 1 else 0.0
+        }
+        return {
+            'plan': candidates[best][0],
+            'lower_bound': lower,
+            'upper_bound': estimates[best],
+            'gap': estimates[best]['mean'] - lower['mean'],
+            'replications': [
+                {'sampled_cost': float(opt), 'evaluated': est}
+                for opt, est in zip(optima, estimates)
+            ]
+        }
+
+    def _build(self, warehouses, hubs, sites, scenarios) -> Dict:
+        """Recourse arcs and one persistent GLOP subproblem per scenario"""
+        alloc_config = self.allocator.config
+        resources = alloc_config['resource_types']
+        W, H, R, S = len(warehouses), len(hubs), len(resources), len(sites)
+        site_index = {site['id']: i for i, site in enumerate(sites)}
+
+        inventory = np.array(
+            [[wh['inventory'].get(res, 0) for res in resources] for wh in warehouses], dtype=np.float64
+        ).reshape(W, R)
+        demands = np.zeros((len(scenarios), S, R))
+        for k, scenario in enumerate(scenarios):
+            for site_id, site_demand in scenario['demands'].items():
+                for r, res in enumerate(resources):
+                    demands[k, site_index[site_id], r] = site_demand.get(res, 0)
+        probabilities = np.array([scenario.get('probability', 1.0) for scenario in scenarios])
+        probabilities = probabilities / probabilities.sum()
+
+        # Origins are warehouses then hubs; hubs can hold anything some warehouse stocks
+        network = self.allocator._network(warehouses + hubs, [site['position'] for site in sites])
+        supplied = np.concatenate([inventory > 0, np.repeat((inventory.sum(0) > 0)[None, :], H, 0)])
+        reachable = network['travel_times'] <= alloc_config['max_response_time']   # [M, O, S]
+        arcs = np.nonzero(
+            reachable[:, :, :, None] & supplied[None, :, None, :] & (demands > 0).any(0)[None, None, :, :]
+        )
+
+        mode_cost = np.array([alloc_config['transport_modes'][m]['cost'] for m in network['modes']])
+        priority = np.array([self.allocator._get_priority_weight(res) for res in resources])
+        site_priority = np.array([site.get('priority', 1.0) for site in sites])
+        penalty = alloc_config.get('shortfall_penalty', 100) * site_priority[:, None] * priority[None, :]
+
+        subproblems = [
+            self._build_subproblem(demands[k], arcs, mode_cost, penalty)
+            for k in range(len(scenarios))
+        ]
+        return {
+            'warehouses': warehouses,
+            'hubs': hubs,
+            'sites': sites,
+            'scenarios': scenarios,
+            'resources': resources,
+            'inventory': inventory,
+            'demands': demands,
+            'probabilities': probabilities,
+            'subproblems': subproblems,
+            'num_arcs': len(arcs[0])
+        }
+
+    def _build_subproblem(self, demand, arcs, mode_cost, penalty) -> Dict:
+        """
+        Recourse LP of one scenario: ship from origins to sites, pay the
+        shortfall penalty for the rest (so every first-stage plan is feasible)
+        """
+        solver = pywraplp.Solver.CreateSolver('GLOP')
+        m, o, s, r = arcs
+        used = np.flatnonzero(demand[s, r] > 0)
+
+        inflow = defaultdict(list)
+        outflow = defaultdict(list)
+        objective = solver.Objective()
+        for i in used.tolist():
+            var = solver.NumVar(0, solver.infinity(), '')
+            objective.SetCoefficient(var, float(mode_cost[m[i]]))
+            inflow[(s[i], r[i])].append(var)
+            outflow[(o[i], r[i])].append(var)
+
+        shortfall = []
+        for site, res in zip(*np.nonzero(demand > 0)):
+            var = solver.NumVar(0, solver.infinity(), '')
+            objective.SetCoefficient(var, float(penalty[site, res]))
+            solver.Add(solver.Sum(inflow[(site, res)]) + var >= float(demand[site, res]))
+            shortfall.append(var)
+        objective.SetMinimization()
+
+        # Right-hand sides are set from the first-stage plan before each solve
+        cap_keys = list(outflow)
+        cap_constraints = [solver.Add(solver.Sum(outflow[key]) <= 0) for key in cap_keys]
+        return {
+            'solver': solver,
+            'shortfall': shortfall,
+            'total_demand': float(demand.sum()),
+            'cap_constraints': cap_constraints,
+            'cap_origin': np.array([key[0] for key in cap_keys], dtype=np.int64),
+            'cap_resource': np.array([key[1] for key in cap_keys], dtype=np.int64)
+        }
+
+    def _capacity(self, model, X) -> np.ndarray:
+        """Stock per (origin, resource) left by prepositioning X[warehouse, hub, resource]"""
+        return np.concatenate([
+            np.maximum(model['inventory'] - X.sum(1), 0),
+            X.sum(0)
+        ])
+
+    def _evaluate(self, model, capacity, duals=True):
+        """
+        Solve every scenario's recourse for the given origin stock
+        Returns:
+            (recourse costs [scenarios], capacity duals [scenarios, origins, resources]
+             or None, fulfillment percentages [scenarios])
+        """
+        n = len(model['subproblems'])
+        costs = np.empty(n)
+        fulfillment = np.empty(n)
+        dual_values = np.zeros((n,) + capacity.shape) if duals else None
+
+        for k, sub in enumerate(model['subproblems']):
+            for ct, bound in zip(sub['cap_constraints'], capacity[sub['cap_origin'], sub['cap_resource']].tolist()):
+                ct.SetUb(bound)
+            if sub['solver'].Solve() != pywraplp.Solver.OPTIMAL:
+                raise RuntimeError(f"Recourse problem for scenario {k} could not be solved")
+
+            costs[k] = sub['solver'].Objective().Value()
+            unmet = sum(var.solution_value() for var in sub['shortfall'])
+            fulfillment[k] = round(100 * (1 - unmet / sub['total_demand']), 2) if sub['total_demand'] else 100.0
+            if duals:
+                dual_values[k, sub['cap_origin'], sub['cap_resource']] = [
+                    ct.dual_value() for ct in sub['cap_constraints']
+                ]
+        return costs, dual_values, fulfillment
+
+    def _decompose(self, model):
+        """
+        Multi-cut L-shaped method: the master LP chooses prepositioning and one
+        recourse estimate per scenario; each iteration adds an optimality cut
+        for every scenario whose estimate is below its true recourse cost
+        Returns:
+            (result dict, dense prepositioning array [warehouses, hubs, resources])
+        """
+        start = time.perf_counter()
+        inventory = model['inventory']
+        W, H, R = len(model['warehouses']), len(model['hubs']), len(model['resources'])
+        probabilities = model['probabilities']
+        tolerance = self.config['tolerance']
+        unit_cost = self.config['preposition_cost']
+
+        master = pywraplp.Solver.CreateSolver('GLOP')
+        xw, xh, xr = np.nonzero(np.broadcast_to(inventory[:, None, :] > 0, (W, H, R)))
+        x_vars = [master.NumVar(0, float(inventory[w, r]), '') for w, r in zip(xw.tolist(), xr.tolist())]
+
+        by_stock = defaultdict(list)
+        by_hub = defaultdict(list)
+        for var, w, h, r in zip(x_vars, xw.tolist(), xh.tolist(), xr.tolist()):
+            by_stock[(w, r)].append(var)
+            by_hub[h].append(var)
+        for (w, r), group in by_stock.items():
+            master.Add(master.Sum(group) <= float(inventory[w, r]))
+        for h, hub in enumerate(model['hubs']):
+            if hub.get('capacity') is not None and by_hub[h]:
+                master.Add(master.Sum(by_hub[h]) <= float(hub['capacity']))
+
+        # Recourse costs are nonnegative, so theta >= 0 bounds the first master
+        theta = [master.NumVar(0, master.infinity(), '') for _ in probabilities]
+        objective = master.Objective()
+        for var in x_vars:
+            objective.SetCoefficient(var, unit_cost)
+        for var, p in zip(theta, probabilities.tolist()):
+            objective.SetCoefficient(var, p)
+        objective.SetMinimization()
+
+        best = None
+        lower = -np.inf
+        cuts = 0
+        for iteration in range(1, self.config['max_iterations'] + 1):
+            if master.Solve() != pywraplp.Solver.OPTIMAL:
+                raise RuntimeError("Prepositioning master problem could not be solved")
+            lower = master.Objective().Value()
+            x_hat = np.array([var.solution_value() for var in x_vars])
+            X = np.zeros((W, H, R))
+            X[xw, xh, xr] = x_hat
+
+            costs, duals, fulfillment = self._evaluate(model, self._capacity(model, X))
+            first_stage = unit_cost * float(x_hat.sum())
+            upper = first_stage + float(probabilities @ costs)
+            if best is None or upper < best['upper']:
+                best = {'upper': upper, 'X': X, 'first_stage': first_stage,
+                        'costs': costs, 'fulfillment': fulfillment}
+
+            if best['upper'] - lower <= tolerance * max(1.0, abs(best['upper'])):
+                break
+
+            # Moving a unit w -> h shifts stock from the warehouse row to the hub row
+            theta_hat = [var.solution_value() for var in theta]
+            for k in range(len(theta)):
+                if theta_hat[k] >= costs[k] - tolerance * max(1.0, abs(costs[k])):
+                    continue
+                gradient = duals[k, W + xh, xr] - duals[k, xw, xr]
+                cut = master.Constraint(float(costs[k] - gradient @ x_hat), master.infinity())
+                cut.SetCoefficient(theta[k], 1)
+                for i in np.flatnonzero(gradient).tolist():
+                    cut.SetCoefficient(x_vars[i], float(-gradient[i]))
+                cuts += 1
+
+        X = best['X']
+        prepositioning = [
+            {
+                'resource': model['resources'][r],
+                'source': model['warehouses'][w]['id'],
+                'hub': model['hubs'][h]['id'],
+                'quantity': float(X[w, h, r])
+            }
+            for w, h, r in zip(*np.nonzero(X > 1e-9))
+        ]
+        result = {
+            'prepositioning': prepositioning,
+            'expected_cost': best['upper'],
+            'first_stage_cost': best['first_stage'],
+            'expected_recourse_cost': best['upper'] - best['first_stage'],
+            'scenarios': {
+                scenario.get('name', f'scenario_{k}'): {
+                    'probability': float(probabilities[k]),
+                    'recourse_cost': float(best['costs'][k]),
+                    'fulfillment_percentage': float(best['fulfillment'][k])
+                }
+                for k, scenario in enumerate(model['scenarios'])
+            },
+            'worst_case_fulfillment': float(best['fulfillment'].min()),
+            'solver_stats': {
+                'method': 'multi_cut_l_shaped',
+                'iterations': iteration,
+                'cuts': cuts,
+                'lower_bound': lower,
+                'gap': round((best['upper'] - lower) / max(1.0, abs(best['upper'])), 6),
+                'num_scenarios': len(model['scenarios']),
+                'num_first_stage_variables': len(x_vars),
+                'num_recourse_arcs': model['num_arcs'],
+                'solve_ms': round((time.perf_counter() - start) * 1000, 3)
+            }
+        }
+        return result, X
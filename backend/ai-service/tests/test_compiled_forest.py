@@ -0,0 +1,42 @@
+# ai-service/tests/test_compiled_forest.py
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('sklearn')
+pytest.importorskip('onnxruntime')
+pytest.importorskip('skl2onnx')
+
+from sklearn.ensemble import RandomForestRegressor
+from models.resource_optimization.compiled_forest import CompiledForest
+
+RTOL = 1e-4
+ATOL = 1e-3
+
+def _fixed_data(n_outputs):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 6)).astype(np.float32)
+    y = np.column_stack([X[:, 0] * 3 + X[:, 1] ** 2 + i for i in range(n_outputs)])
+    return X, (y[:, 0] if n_outputs == 1 else y)
+
+@pytest.mark.parametrize('n_outputs', [1, 3])
+def test_compiled_forest_matches_sklearn(n_outputs):
+    X, y = _fixed_data(n_outputs)
+    model = RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+    compiled = CompiledForest(model, X.shape[1])
+    
+    X_test = np.random.default_rng(1).normal(size=(64, X.shape[1])).astype(np.float32)
+    expected = model.predict(X_test)
+    actual = compiled.predict(X_test)
+    
+    assert actual.shape == expected.shape
+    np.testing.assert_allclose(actual, expected, rtol=RTOL, atol=ATOL)
+    compiled.check_parity(model, X_test)
+
+def test_check_parity_rejects_a_different_model():
+    X, y = _fixed_data(1)
+    model = RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0).fit(X, y)
+    other = RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0).fit(X, y + 10)
+    compiled = CompiledForest(model, X.shape[1])
+    
+    with pytest.raises(ValueError):
+        compiled.check_parity(other, X)